@@ -0,0 +1,83 @@
+"""
+Stress test of many accounts sharing one connection pool. Threads send
+searches for random accounts through an AccountPool, and the stub server
+echoes the API key each request arrived with. Every account has a result
+cache, and part of each search is names all accounts search, so a cache
+shared across accounts would hand out another account's results. Any
+result carrying another account's key, or another request's domain, is
+reported as a leak.
+
+    python benchmarks/bench_accounts.py --accounts 50 --threads 64
+"""
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dynadotpy.accounts import AccountPool
+from dynadotpy.cache import ResultCache
+from dynadotpy.ratelimit import RateLimiter
+from dynadotpy.stub import StubServer
+from dynadotpy.transport import RequestsTransport, Urllib3Transport
+
+TRANSPORTS = {"requests": RequestsTransport, "urllib3": Urllib3Transport}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--rate", type=float, default=1000,
+        help="Requests per second allowed per account.")
+    parser.add_argument("--transport", choices=sorted(TRANSPORTS),
+        default="requests")
+    parser.add_argument("--shared-names", type=int, default=20,
+        help="Names searched by every account, to hit the caches.")
+    args = parser.parse_args()
+
+    keys = ["account%d" % num for num in range(args.accounts)]
+    sent = dict.fromkeys(keys, 0)
+    leaks = []
+
+    with StubServer(echo_key=True) as stub:
+        transport = TRANSPORTS[args.transport](pool_maxsize=args.threads)
+        accounts = AccountPool(transport=transport, api_url=stub.url,
+            rate_limiter_factory=lambda key: RateLimiter(rate=args.rate),
+            cache_factory=lambda key: ResultCache())
+
+        def call(num):
+            key = random.choice(keys)
+            domains = ["%s-%d-%d.com" % (key, num, part) for part in range(3)]
+            domains.append("shared%d.com" % random.randrange(
+                args.shared_names))
+            results = accounts.client(key).search(domains)
+            for domain, result in zip(domains, results):
+                if result["info"] != key or result["domain"] != domain:
+                    leaks.append((key, domain, dict(result)))
+            return key
+
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            for key in executor.map(call, range(args.calls)):
+                sent[key] += 1
+        elapsed = time.time() - started
+
+        budgets = accounts.stats()
+        accounts.close()
+
+    mismatched = [key for key in keys
+        if budgets[key]["commands"]["search"]["calls"] != sent[key]]
+    print("%d calls for %d accounts in %.2fs, %.0f calls/s" % (args.calls,
+        args.accounts, elapsed, args.calls / elapsed))
+    print("cross-account results: %d" % len(leaks))
+    print("accounts with wrong rate limiter counts: %d" % len(mismatched))
+    for leak in leaks[:10]:
+        print("LEAK %s %s %r" % leak)
+    if leaks or mismatched:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
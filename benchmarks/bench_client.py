@@ -0,0 +1,114 @@
+"""
+Throughput and latency of the Dynadot client against the bundled stub
+server, across concurrency levels and search payload sizes.
+
+    python benchmarks/bench_client.py
+    python benchmarks/bench_client.py --save baseline.json
+    python benchmarks/bench_client.py --baseline baseline.json --tolerance 0.2
+    python benchmarks/bench_client.py --transport urllib3
+
+With ``--baseline`` the run fails if any scenario's throughput dropped by
+more than ``--tolerance`` compared to the saved results.
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dynadotpy.client import Dynadot
+from dynadotpy.stub import StubServer
+from dynadotpy.transport import RequestsTransport, Urllib3Transport
+
+TRANSPORTS = {"requests": RequestsTransport, "urllib3": Urllib3Transport}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def scenarios(sizes):
+    yield "get_nameservers", lambda dyn, num: dyn.get_nameservers(
+        domain="owned%d.com" % (num % 100))
+    yield "set_nameservers", lambda dyn, num: dyn.set_nameservers(
+        domain="owned%d.com" % (num % 100),
+        nameservers=["ns1.example.com", "ns2.example.com"])
+    for size in sizes:
+        domains = ["bench%d.com" % num for num in range(size)]
+        yield "search x%d" % size, lambda dyn, num, domains=domains: (
+            dyn.search(domains))
+
+
+def run(dyn, call, calls, concurrency):
+    def timed(num):
+        started = time.time()
+        call(dyn, num)
+        return time.time() - started
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(timed, range(calls)))
+    elapsed = time.time() - started
+
+    return {
+        "rps": calls / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+",
+        default=[1, 4, 16, 64])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--latency", type=float, default=0.0,
+        help="Stub server latency in seconds.")
+    parser.add_argument("--transport", choices=sorted(TRANSPORTS),
+        default="requests")
+    parser.add_argument("--save", help="Write results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare with this JSON file.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = {}
+    with StubServer(latency=args.latency) as stub:
+        setup = Dynadot(api_key="bench")
+        setup.API_URL = stub.url
+        for num in range(100):
+            setup.register(domain="owned%d.com" % num, duration=1)
+
+        print("%-16s %5s %10s %10s %10s" % ("scenario", "conc", "req/s",
+            "p50 ms", "p99 ms"))
+        for name, call in scenarios(args.sizes):
+            for concurrency in args.concurrency:
+                transport = TRANSPORTS[args.transport](
+                    pool_maxsize=concurrency)
+                with Dynadot(api_key="bench", transport=transport) as dyn:
+                    dyn.API_URL = stub.url
+                    result = run(dyn, call, args.calls, concurrency)
+                results["%s @%d" % (name, concurrency)] = result
+                print("%-16s %5d %10.1f %10.2f %10.2f" % (name, concurrency,
+                    result["rps"], result["p50"] * 1000, result["p99"] * 1000))
+
+    if args.save:
+        with open(args.save, "w") as fp:
+            json.dump(results, fp, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+        regressions = [key for key, result in results.items()
+            if key in baseline and
+            result["rps"] < baseline[key]["rps"] * (1 - args.tolerance)]
+        for key in sorted(regressions):
+            print("REGRESSION %s: %.1f req/s, baseline %.1f req/s" % (key,
+                results[key]["rps"], baseline[key]["rps"]))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Stress test of searches sharing a result cache and coalesced requests.
+Threads search overlapping domain lists through one client. Any result
+list that is numbered wrong, holds another search's domains, or shares a
+result object with another call is reported as a leak.
+
+    python benchmarks/bench_coalesce.py --threads 32 --calls 5000
+"""
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dynadotpy.cache import ResultCache
+from dynadotpy.client import Dynadot
+from dynadotpy.stub import StubServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--names", type=int, default=20,
+        help="Distinct domains the searches are drawn from.")
+    parser.add_argument("--latency", type=float, default=0.002,
+        help="Stub server latency in seconds.")
+    args = parser.parse_args()
+
+    names = ["name%d.com" % num for num in range(args.names)]
+    leaks = []
+    seen = {}
+
+    with StubServer(latency=args.latency) as stub:
+        dyn = Dynadot(api_key="bench", coalesce=True,
+            cache=ResultCache(ttl={"search": 0.05}),
+            pool_maxsize=args.threads)
+        dyn.API_URL = stub.url
+
+        def call(num):
+            domains = random.sample(names, random.randint(1, 4))
+            results = dyn.search(domains)
+            for pos, (domain, result) in enumerate(zip(domains, results)):
+                if (result["domain"] != domain or
+                        result["domain_param"] != "domain%d" % pos):
+                    leaks.append((num, domains, dict(result)))
+                owner = seen.setdefault(id(result), (num, result))
+                if owner[0] != num and owner[1] is result:
+                    leaks.append((num, domains, "shared with call %d"
+                        % owner[0]))
+            if len(results) != len(domains):
+                leaks.append((num, domains, "%d results" % len(results)))
+
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            list(executor.map(call, range(args.calls)))
+        elapsed = time.time() - started
+
+    print("%d searches in %.2fs, %.0f searches/s, %s" % (args.calls, elapsed,
+        args.calls / elapsed, dyn.flight.stats()))
+    print("leaked or misnumbered results: %d" % len(leaks))
+    for leak in leaks[:10]:
+        print("LEAK %s %s %r" % leak)
+    if leaks:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
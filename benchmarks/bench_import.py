@@ -0,0 +1,71 @@
+"""
+Cold start of the client: import time, construction time and the first
+command against the bundled stub server, each measured in a fresh
+interpreter.
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --max-import-ms 20
+
+With ``--max-import-ms`` the run fails if importing and constructing the
+client takes longer, or if it loads ``requests`` before the first request.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from dynadotpy.stub import StubServer
+
+COLD_START = """
+import json, sys, time
+started = time.time()
+from dynadotpy.client import Dynadot
+imported = time.time()
+dyn = Dynadot(api_key="bench")
+dyn.API_URL = sys.argv[1]
+constructed = time.time()
+eager = sorted(name for name in ("requests", "urllib3", "concurrent.futures")
+    if name in sys.modules)
+dyn.get_nameservers(domain="example.com")
+called = time.time()
+print(json.dumps({"import": imported - started,
+    "construct": constructed - imported, "first_call": called - constructed,
+    "eager": eager}))
+"""
+
+
+def cold_start(url):
+    output = subprocess.check_output([sys.executable, "-c", COLD_START, url])
+    return json.loads(output.decode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-import-ms", type=float,
+        help="Fail if import and construction take longer than this.")
+    args = parser.parse_args()
+
+    with StubServer() as stub:
+        runs = [cold_start(stub.url) for _ in range(args.runs)]
+
+    print("%-12s %10s %10s" % ("stage", "median ms", "max ms"))
+    medians = {}
+    for stage in ("import", "construct", "first_call"):
+        times = sorted(run[stage] * 1000 for run in runs)
+        medians[stage] = times[len(times) // 2]
+        print("%-12s %10.2f %10.2f" % (stage, medians[stage], times[-1]))
+
+    eager = sorted(set(name for run in runs for name in run["eager"]))
+    print("loaded before the first request: %s" % (", ".join(eager) or "-"))
+
+    if args.max_import_ms is not None:
+        startup = medians["import"] + medians["construct"]
+        if startup > args.max_import_ms or "requests" in eager:
+            print("REGRESSION: %.2f ms to import and construct, "
+                "limit %.2f ms" % (startup, args.max_import_ms))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
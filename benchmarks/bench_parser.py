@@ -0,0 +1,53 @@
+"""
+Compare the list-based search parser with the streaming parser on a
+100-domain response: time per response and memory held per result.
+
+    python benchmarks/bench_parser.py [iterations]
+"""
+import sys
+import timeit
+import tracemalloc
+
+from dynadotpy import parser
+from dynadotpy.client import Dynadot
+
+RESPONSE = "ok,\n\n" + "".join("domain%d,example%d.com,,%s,\n" % (
+    num, num, "yes" if num % 3 else "no") for num in range(100))
+CHUNKS = [RESPONSE[start:start + 8192]
+    for start in range(0, len(RESPONSE), 8192)]
+
+
+def list_parser(dyn):
+    return dyn._parse_search_results(
+        results=dyn._check_response_status(RESPONSE))
+
+
+def streaming_parser():
+    lines = parser.iter_lines(CHUNKS)
+    parser.read_status(lines)
+    return list(parser.iter_search_records(lines))
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    dyn = Dynadot(api_key="bench")
+
+    expected = list_parser(dyn)
+    assert streaming_parser() == expected
+
+    for label, func in (("list", lambda: list_parser(dyn)),
+                        ("streaming", streaming_parser)):
+        elapsed = min(timeit.repeat(func, number=iterations, repeat=5))
+
+        tracemalloc.start()
+        results = [func() for _ in range(100)]
+        held = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del results
+
+        print("%-10s %8.1f us/response %8.1f bytes/result" % (label,
+            elapsed / iterations * 1e6, held / (100.0 * len(expected))))
+
+
+if __name__ == "__main__":
+    main()
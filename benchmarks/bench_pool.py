@@ -0,0 +1,37 @@
+"""
+Compare requests/sec of one-shot ``requests.get`` calls against the pooled
+``Dynadot`` client, using the bundled api2.html stub.
+
+    python benchmarks/bench_pool.py [calls]
+"""
+import sys
+import time
+
+import requests
+
+from dynadotpy.client import Dynadot
+from dynadotpy.stub import StubServer
+
+
+def run(label, call, calls):
+    start = time.time()
+    for _ in range(calls):
+        call()
+    elapsed = time.time() - start
+    print("%-10s %6d calls  %8.1f req/s" % (label, calls, calls / elapsed))
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with StubServer() as stub:
+        params = {"key": "bench", "command": "search", "domain0": "example.com"}
+        run("unpooled", lambda: requests.get(stub.url, params=params), calls)
+
+        with Dynadot(api_key="bench") as dyn:
+            dyn.API_URL = stub.url
+            run("pooled", lambda: dyn.search(domains=["example.com"]), calls)
+
+
+if __name__ == "__main__":
+    main()
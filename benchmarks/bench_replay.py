@@ -0,0 +1,85 @@
+"""
+Throughput of the client's parse and dispatch path with the network taken
+out. Responses are recorded once from the bundled stub server, or loaded
+from an earlier recording, and replayed from memory.
+
+    python benchmarks/bench_replay.py
+    python benchmarks/bench_replay.py --recording responses.jsonl --profile
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import tempfile
+import time
+
+from dynadotpy.client import Dynadot
+from dynadotpy.stub import StubServer
+from dynadotpy.transport import (RecordingTransport, ReplayTransport,
+    RequestsTransport)
+
+
+def workload(dyn, sizes):
+    for num in range(100):
+        dyn.get_nameservers(domain="owned%d.com" % num)
+        dyn.set_nameservers(domain="owned%d.com" % num,
+            nameservers=["ns1.example.com", "ns2.example.com"])
+    for size in sizes:
+        dyn.search(["bench%d.com" % num for num in range(size)])
+
+
+def record(path, sizes):
+    with StubServer() as stub:
+        setup = Dynadot(api_key="bench")
+        setup.API_URL = stub.url
+        for num in range(100):
+            setup.register(domain="owned%d.com" % num, duration=1)
+
+        transport = RecordingTransport(RequestsTransport(), path)
+        with Dynadot(api_key="bench", transport=transport) as dyn:
+            dyn.API_URL = stub.url
+            workload(dyn, sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--recording",
+        help="Replay this file, recording it first if it does not exist.")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--profile", action="store_true",
+        help="Print the top functions by cumulative time.")
+    args = parser.parse_args()
+
+    path = args.recording
+    if path is None:
+        handle, path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(handle)
+        os.remove(path)
+    if not os.path.exists(path):
+        record(path, args.sizes)
+
+    transport = ReplayTransport(path)
+    dyn = Dynadot(api_key="bench", transport=transport)
+    profiler = cProfile.Profile() if args.profile else None
+
+    started = time.time()
+    if profiler is not None:
+        profiler.enable()
+    for _ in range(args.rounds):
+        workload(dyn, args.sizes)
+    if profiler is not None:
+        profiler.disable()
+    elapsed = time.time() - started
+
+    print("%d commands in %.2fs, %.0f commands/s" % (transport.replayed,
+        elapsed, transport.replayed / elapsed))
+    if profiler is not None:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+
+    if args.recording is None:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Latency of register calls issued during a large search sweep, with all
+commands in one FIFO thread pool versus the priority scheduler.
+
+    python benchmarks/bench_scheduler.py --searches 2000 --registers 20
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dynadotpy.client import Dynadot
+from dynadotpy.ratelimit import RateLimiter
+from dynadotpy.scheduler import Scheduler
+from dynadotpy.stub import StubServer
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def sweep(submit, searches, registers):
+    """Submit the searches, with registers spread through the sweep."""
+    every = max(1, searches // registers)
+    latencies = []
+    futures = []
+    orders = 0
+
+    def timed(started):
+        def done(future):
+            latencies.append(time.time() - started)
+        return done
+
+    for num in range(searches):
+        futures.append(submit("search", domains=["sweep%d.com" % num]))
+        if num % every == every // 2 and orders < registers:
+            orders += 1
+            future = submit("register", domain="order%d.com" % num,
+                duration=1)
+            future.add_done_callback(timed(time.time()))
+            futures.append(future)
+    for future in futures:
+        future.result()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--searches", type=int, default=2000)
+    parser.add_argument("--registers", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=500,
+        help="Shared rate limit in requests per second.")
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency) as stub:
+        def client():
+            dyn = Dynadot(api_key="bench", pool_maxsize=args.workers,
+                rate_limiter=RateLimiter(rate=args.rate))
+            dyn.API_URL = stub.url
+            return dyn
+
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            dyn = client()
+            fifo = sweep(lambda method, **kwargs: executor.submit(
+                getattr(dyn, method), **kwargs), args.searches, args.registers)
+
+        stub.domains.clear()
+        with Scheduler(client(), workers=args.workers) as scheduler:
+            scheduled = sweep(scheduler.submit, args.searches, args.registers)
+            stats = scheduler.stats()
+
+    print("%-10s %10s %10s" % ("register", "p50 ms", "max ms"))
+    for name, latencies in (("fifo", fifo), ("scheduler", scheduled)):
+        print("%-10s %10.1f %10.1f" % (name, percentile(latencies, 0.5) * 1000,
+            max(latencies) * 1000))
+    for priority, stat in sorted(stats.items()):
+        print("priority %d: %d sent, mean wait %.1f ms" % (priority,
+            stat["sent"], stat["wait_time"] / max(1, stat["sent"]) * 1000))
+
+
+if __name__ == "__main__":
+    main()
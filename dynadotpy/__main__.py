@@ -0,0 +1,5 @@
+import sys
+
+from dynadotpy.cli import main
+
+sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Clients for many Dynadot accounts sharing one connection pool.
+"""
+import threading
+
+from dynadotpy.client import Dynadot
+
+
+class AccountPool(object):
+    """
+    Keeps one :class:`dynadotpy.client.Dynadot` per API key. All clients
+    send through one shared transport, so connections to the API are
+    reused across accounts, while each account gets its own rate limiter
+    from ``rate_limiter_factory`` and so its own request budget.
+
+    Clients are created on first use and may be shared by any number of
+    threads. A cache, store or journal holds one account's data, so each
+    account gets its own from ``cache_factory``, ``store_factory`` and
+    ``journal_factory`` rather than sharing one.
+
+    ::
+        >>> from dynadotpy.ratelimit import RateLimiter
+        >>> accounts = AccountPool(pool_maxsize=32,
+        ...     rate_limiter_factory=lambda key: RateLimiter(rate=5,
+        ...         adaptive=True))
+        >>> accounts.client("<key1>").search(["example.com"])
+        >>> accounts.client("<key2>").renew(domain="example.net", duration=1)
+    """
+
+    PER_ACCOUNT = ("cache", "journal", "rate_limiter", "store")
+
+    def __init__(self, transport=None, rate_limiter_factory=None,
+                 pool_maxsize=10, api_url=None, cache_factory=None,
+                 store_factory=None, journal_factory=None, **client_kwargs):
+        """
+        :param transport: :class:`dynadotpy.transport.Transport` shared by
+            all accounts. Defaults to a
+            :class:`dynadotpy.transport.RequestsTransport`.
+        :param rate_limiter_factory: Optional callable taking an API key and
+            returning the :class:`dynadotpy.ratelimit.RateLimiter` for it.
+        :param pool_maxsize: Connections kept open for all accounts
+            together, used for the default transport.
+        :param api_url: Overrides the clients' ``API_URL``.
+        :param cache_factory: Optional callable taking an API key and
+            returning the :class:`dynadotpy.cache.ResultCache` for it.
+        :param store_factory: Optional callable taking an API key and
+            returning the :class:`dynadotpy.store.DomainStore` for it.
+        :param journal_factory: Optional callable taking an API key and
+            returning the :class:`dynadotpy.journal.Journal` for it.
+        :param client_kwargs: Other arguments for every client, such as
+            ``timeout`` or ``retry_policy``.
+        :raises ValueError: If ``client_kwargs`` holds a cache, store,
+            journal or rate limiter, which must not be shared by accounts.
+        """
+        shared = sorted(set(self.PER_ACCOUNT) & set(client_kwargs))
+        if shared:
+            raise ValueError("%s would be shared by all accounts, pass "
+                "%s instead." % (", ".join(shared), ", ".join(
+                    "%s_factory" % name for name in shared)))
+
+        if transport is None:
+            from dynadotpy.transport import RequestsTransport
+            transport = RequestsTransport(pool_maxsize=pool_maxsize)
+        self.transport = transport
+        self.factories = {"cache": cache_factory, "journal": journal_factory,
+            "rate_limiter": rate_limiter_factory, "store": store_factory}
+        self.api_url = api_url
+        self.client_kwargs = client_kwargs
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._clients)
+
+    def __contains__(self, api_key):
+        return api_key in self._clients
+
+    def client(self, api_key):
+        """Return the client for ``api_key``, creating it on first use."""
+        client = self._clients.get(api_key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                client = self._clients[api_key] = self._new_client(api_key)
+        return client
+
+    def add(self, api_key, rate_limiter=None, **kwargs):
+        """
+        Create the client for ``api_key`` with its own options, replacing
+        any existing one.
+
+        :param rate_limiter: Overrides ``rate_limiter_factory``.
+        :param kwargs: Overrides the pool's client arguments.
+        """
+        with self._lock:
+            client = self._clients[api_key] = self._new_client(api_key,
+                rate_limiter, **kwargs)
+        return client
+
+    def remove(self, api_key):
+        """Forget the client for ``api_key``."""
+        with self._lock:
+            self._clients.pop(api_key, None)
+
+    def keys(self):
+        """Return the API keys that have a client."""
+        with self._lock:
+            return list(self._clients)
+
+    def stats(self):
+        """Return a `dict` of API key to its rate limiter's stats."""
+        with self._lock:
+            clients = list(self._clients.items())
+        return {api_key: client.rate_limiter.stats()
+            for api_key, client in clients
+            if client.rate_limiter is not None}
+
+    def close(self):
+        """Close the shared transport."""
+        self.transport.close()
+
+    def _new_client(self, api_key, rate_limiter=None, **kwargs):
+        options = dict(self.client_kwargs)
+        options.update(kwargs)
+        if rate_limiter is not None:
+            options["rate_limiter"] = rate_limiter
+        for name, factory in self.factories.items():
+            if options.get(name) is None and factory is not None:
+                options[name] = factory(api_key)
+        options["transport"] = self.transport
+        client = Dynadot(api_key, **options)
+        if self.api_url is not None:
+            client.API_URL = self.api_url
+        return client
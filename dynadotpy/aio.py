@@ -0,0 +1,182 @@
+"""
+Asyncio client for the Dynadot.com API v2.
+
+Requires Python 3.6+ and aiohttp (``pip install dynadotpy[async]``).
+"""
+import asyncio
+from itertools import islice
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from dynadotpy.client import BaseClient
+
+
+class AsyncDynadot(BaseClient):
+    """
+    Non-blocking counterpart of :class:`dynadotpy.client.Dynadot`. Every
+    command is a coroutine with the same arguments and return values as
+    the blocking client, and responses are parsed by the same ``_parse_*``
+    methods of :class:`dynadotpy.client.BaseClient`.
+
+    Only the API commands and :meth:`bulk_search` are available. Hooks,
+    caching, rate limiting, retries, the circuit breaker, the store and
+    the journal belong to the blocking client.
+    """
+
+    def __init__(self, api_key, max_concurrency=100, limit_per_host=0,
+                 keep_alive=True, timeout=None, compact_results=False):
+        """
+        :param api_key: String of your Dynadot API key.
+        :param max_concurrency: Maximum number of requests in flight.
+        :param limit_per_host: Maximum connections per host, 0 for no limit
+            beyond ``max_concurrency``.
+        :param keep_alive: Reuse connections between commands.
+        :param timeout: Seconds to wait for the API before giving up.
+        :param compact_results: Return the read-only result objects of
+            :mod:`dynadotpy.results` instead of `dict` results.
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncDynadot requires aiohttp. Install it with "
+                "`pip install dynadotpy[async]`.")
+
+        self.API_KEY = api_key
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        self.keep_alive = keep_alive
+        self.compact_results = compact_results
+        self.session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def __enter__(self):
+        raise TypeError("Use `async with` with AsyncDynadot.")
+
+    async def close(self):
+        """Close all pooled connections held by this client."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def bulk_search(self, domains, max_workers=4, batch_size=100):
+        """
+        Search any number of domains in concurrent batches. An async
+        generator of ``(batch_number, result)`` tuples, see
+        :meth:`Dynadot.bulk_search`.
+        """
+        if batch_size > 100:
+            raise Exception("Too many domain names. Dynadot only allows up to"
+                "100 domains.")
+
+        batches = enumerate(self._chunks(domains, batch_size))
+        pending = {}
+        for number, batch in islice(batches, max_workers):
+            pending[asyncio.ensure_future(self.search(batch))] = number
+
+        while pending:
+            done, _ = await asyncio.wait(pending,
+                return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                number = pending.pop(future)
+                for next_number, batch in islice(batches, 1):
+                    pending[asyncio.ensure_future(self.search(batch))] = (
+                        next_number)
+
+                try:
+                    results = future.result()
+                except Exception as exc:
+                    results = {"error": str(exc) or exc.__class__.__name__}
+                if isinstance(results, dict):
+                    yield number, results
+                    continue
+                for result in results:
+                    yield number, result
+
+    async def delete(self, domain):
+        """Delete a domain. See :meth:`Dynadot.delete`."""
+        response = await self._send_command(command="delete", domain=domain)
+        return self._public(self._result("delete", response,
+            self._parse_delete_results))
+
+    async def get_nameservers(self, domain):
+        """Get nameservers for a domain. See :meth:`Dynadot.get_nameservers`."""
+        response = await self._send_command(command="get_ns", domain=domain)
+        return self._public(self._result("get_ns", response,
+            self._parse_get_nameservers_results))
+
+    async def register(self, domain, duration):
+        """Register a domain. See :meth:`Dynadot.register`."""
+        response = await self._send_command(command="register", domain=domain,
+            duration=duration)
+        return self._public(self._result("register", response,
+            self._parse_register_renew_results))
+
+    async def renew(self, domain, duration):
+        """Renew a domain. See :meth:`Dynadot.renew`."""
+        response = await self._send_command(command="renew", domain=domain,
+            duration=duration)
+        return self._public(self._result("renew", response,
+            self._parse_register_renew_results))
+
+    async def search(self, domains):
+        """Search for available domains. See :meth:`Dynadot.search`."""
+        response = await self._send_command(command="search",
+            **self._search_params(domains))
+        return self._public(self._search_result(response))
+
+    async def set_folder(self, domain, folder):
+        """Move a domain into a folder. See :meth:`Dynadot.set_folder`."""
+        response = await self._send_command(command="set_folder",
+            domain=domain, folder=folder)
+        return self._public(self._result("set_folder", response,
+            self._parse_set_folder_results))
+
+    async def set_nameservers(self, domain, nameservers):
+        """Set nameservers for a domain. See :meth:`Dynadot.set_nameservers`."""
+        response = await self._send_command(command="set_ns", domain=domain,
+            **self._nameserver_params(nameservers))
+        return self._public(self._result("set_ns", response,
+            self._parse_set_nameservers_results))
+
+    async def set_renew_option(self, domain, option):
+        """Set a domain's renew option. See :meth:`Dynadot.set_renew_option`."""
+        self._check_renew_option(option)
+
+        response = await self._send_command(command="set_renew_option",
+            domain=domain, option=option)
+        return self._public(self._result("set_renew_option", response,
+            self._parse_set_renew_option_results))
+
+    def _get_session(self):
+        """Create the HTTP session on first use, inside the running loop."""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency,
+                limit_per_host=self.limit_per_host,
+                force_close=not self.keep_alive)
+            self.session = aiohttp.ClientSession(connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.session
+
+    async def _send_command(self, **kwargs):
+        """
+        Uses kwargs passed in to build a request to the Dynadot API.
+        :returns: Response text
+        """
+        payload = {key: str(value)
+            for key, value in dict(kwargs, key=self.API_KEY).items()}
+
+        session = self._get_session()
+        async with self._semaphore:
+            async with session.get(self.API_URL, params=payload) as req:
+                text = await req.text()
+
+        return self._check_response_status(text)
@@ -0,0 +1,167 @@
+"""
+Run many Dynadot commands on a bounded worker pool.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+from dynadotpy.client import COMMAND_RESPONSES
+
+
+class OperationResult(object):
+    """Outcome of one ``(command, kwargs)`` operation in a batch."""
+    __slots__ = ("index", "command", "kwargs", "result", "status", "message",
+        "success", "latency", "error")
+
+    def __init__(self, index, command, kwargs):
+        self.index = index
+        self.command = command
+        self.kwargs = kwargs
+        self.result = None
+        self.status = None
+        self.message = None
+        self.success = False
+        self.latency = 0.0
+        self.error = None
+
+    def __repr__(self):
+        return "<OperationResult %d %s %s %s>" % (self.index, self.command,
+            self.kwargs.get("domain"), self.status)
+
+
+class BatchReport(object):
+    """Per-operation results of a finished batch, in input order."""
+
+    def __init__(self, results, elapsed):
+        self.results = results
+        self.elapsed = elapsed
+        self.statuses = {}
+        for result in results:
+            self.statuses[result.status] = (
+                self.statuses.get(result.status, 0) + 1)
+
+    @property
+    def succeeded(self):
+        return [result for result in self.results if result.success]
+
+    @property
+    def failed(self):
+        return [result for result in self.results if not result.success]
+
+
+class BatchExecutor(object):
+    """
+    Runs operations against one :class:`dynadotpy.client.Dynadot` client on
+    ``max_workers`` threads, sharing its connection pool, rate limiter and
+    retry policy. Operations for the same domain run one after another in
+    the order given, while different domains run in parallel.
+    """
+
+    def __init__(self, client, max_workers=8):
+        """
+        :param client: The :class:`dynadotpy.client.Dynadot` to use. Its
+            ``pool_maxsize`` should be at least ``max_workers``.
+        :param max_workers: Number of worker threads.
+        """
+        self.client = client
+        self.max_workers = max_workers
+
+    def run(self, operations, stop_on=()):
+        """
+        Run operations, yielding each :class:`OperationResult` as soon as it
+        finishes.
+
+        :param operations: Iterable of ``(command, kwargs)`` tuples.
+        :param stop_on: Statuses that stop the batch. Operations already
+            sent still finish, the rest are yielded with status
+            ``"skipped"``.
+        """
+        groups = OrderedDict()
+        total = 0
+        for index, (command, kwargs) in enumerate(operations):
+            if command not in self.client.COMMANDS:
+                raise ValueError("Unknown command: %s" % command)
+            groups.setdefault(kwargs.get("domain", index), []).append(
+                (index, command, kwargs))
+            total = index + 1
+
+        finished = Queue()
+        cancelled = threading.Event()
+
+        def run_group(group):
+            for index, command, kwargs in group:
+                if cancelled.is_set():
+                    operation = OperationResult(index, command, kwargs)
+                    operation.status = "skipped"
+                    operation.message = "The batch was stopped"
+                    finished.put(operation)
+                    continue
+                operation = self._run_one(index, command, kwargs)
+                if operation.status in stop_on:
+                    cancelled.set()
+                finished.put(operation)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for group in groups.values():
+                executor.submit(run_group, group)
+
+            try:
+                for _ in range(total):
+                    yield finished.get()
+            finally:
+                cancelled.set()
+
+    def execute(self, operations, progress=None, stop_on=()):
+        """
+        Run operations and wait for all of them.
+
+        :param operations: Iterable of ``(command, kwargs)`` tuples.
+        :param progress: Optional callable receiving each
+            :class:`OperationResult` as it finishes.
+        :param stop_on: Statuses that stop the batch, see :meth:`run`.
+        :return: :class:`BatchReport`.
+        """
+        started = time.time()
+        results = []
+        for result in self.run(operations, stop_on):
+            results.append(result)
+            if progress is not None:
+                progress(result)
+
+        results.sort(key=lambda result: result.index)
+        return BatchReport(results, time.time() - started)
+
+    def _run_one(self, index, command, kwargs):
+        operation = OperationResult(index, command, kwargs)
+        started = time.time()
+        try:
+            result = getattr(self.client, command)(**kwargs)
+        except Exception as exc:
+            operation.error = exc
+            operation.status = "exception"
+            operation.message = str(exc)
+        else:
+            operation.result = result
+            self._set_status(operation, result)
+        operation.latency = time.time() - started
+        return operation
+
+    def _set_status(self, operation, result):
+        if isinstance(result, list):
+            operation.status = "success"
+            operation.success = True
+        elif "error" in result and "result" not in result:
+            operation.status = "error"
+            operation.message = result["error"]
+        else:
+            operation.status = result["result"]
+            operation.success = operation.status == "success"
+            responses = COMMAND_RESPONSES[self.client.COMMANDS[operation.command]]
+            operation.message = result.get("more_info") or responses.get(
+                operation.status)
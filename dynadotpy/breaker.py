@@ -0,0 +1,133 @@
+"""
+Per-TLD circuit breaker for registries that are offline.
+"""
+import threading
+import time
+
+
+class _Circuit(object):
+    __slots__ = ("state", "failures", "opened_at", "probes", "rejected",
+        "trips")
+
+    def __init__(self):
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probes = 0
+        self.rejected = 0
+        self.trips = 0
+
+
+class CircuitBreaker(object):
+    """
+    Tracks ``offline`` results per TLD. After ``failure_threshold``
+    consecutive ``offline`` results the TLD's circuit opens, and commands
+    for it fail locally with ``offline`` instead of being sent. After
+    ``recovery_timeout`` seconds the circuit is half-open: up to
+    ``half_open_calls`` probe requests go through. A healthy probe closes
+    the circuit again, another ``offline`` reopens it.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30.0,
+                 half_open_calls=1, failure_results=("offline",)):
+        """
+        :param failure_threshold: Consecutive failures that open a circuit.
+        :param recovery_timeout: Seconds a circuit stays open before probing.
+        :param half_open_calls: Probe requests allowed while half-open.
+        :param failure_results: Result codes that count as failures.
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_calls = half_open_calls
+        self.failure_results = frozenset(failure_results)
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def allow(self, tld):
+        """Return True if a request for ``tld`` may be sent now."""
+        with self._lock:
+            circuit = self._circuits.get(tld)
+            if circuit is None or circuit.state == self.CLOSED:
+                return True
+
+            if circuit.state == self.OPEN:
+                if time.time() - circuit.opened_at < self.recovery_timeout:
+                    circuit.rejected += 1
+                    return False
+                circuit.state = self.HALF_OPEN
+                circuit.probes = 0
+
+            if circuit.probes < self.half_open_calls:
+                circuit.probes += 1
+                return True
+            circuit.rejected += 1
+            return False
+
+    def record(self, tld, results):
+        """Record the result codes a request for ``tld`` got back."""
+        failed = bool(results) and all(
+            result in self.failure_results for result in results)
+
+        with self._lock:
+            circuit = self._circuits.get(tld)
+            if circuit is None:
+                if not failed:
+                    return
+                circuit = self._circuits[tld] = _Circuit()
+
+            if not failed:
+                circuit.state = self.CLOSED
+                circuit.failures = 0
+                return
+
+            circuit.failures += 1
+            if circuit.state == self.HALF_OPEN or (
+                    circuit.failures >= self.failure_threshold and
+                    circuit.state == self.CLOSED):
+                self._open(circuit)
+
+    def record_error(self, tld):
+        """
+        Record that a request for ``tld`` raised or got an error response
+        without result codes. A half-open circuit counts it as a failed
+        probe and opens again; closed circuits are not affected.
+        """
+        with self._lock:
+            circuit = self._circuits.get(tld)
+            if circuit is not None and circuit.state == self.HALF_OPEN:
+                circuit.failures += 1
+                self._open(circuit)
+
+    def state(self, tld):
+        """Return the circuit state of ``tld``."""
+        with self._lock:
+            circuit = self._circuits.get(tld)
+            return self.CLOSED if circuit is None else circuit.state
+
+    def snapshot(self):
+        """
+        Return a `dict` of TLD to its ``state``, consecutive ``failures``,
+        requests ``rejected`` while open, times it ``tripped`` and when it
+        was last ``opened_at``.
+        """
+        with self._lock:
+            return {tld: {
+                "state": circuit.state,
+                "failures": circuit.failures,
+                "rejected": circuit.rejected,
+                "tripped": circuit.trips,
+                "opened_at": circuit.opened_at,
+            } for tld, circuit in self._circuits.items()}
+
+    def _open(self, circuit):
+        circuit.state = self.OPEN
+        circuit.opened_at = time.time()
+        circuit.trips += 1
+
+
+def tld_of(domain):
+    """Return the lowercased TLD of a domain name."""
+    return domain.rstrip(".").rsplit(".", 1)[-1].lower()
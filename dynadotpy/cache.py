@@ -0,0 +1,85 @@
+"""
+In-memory read cache for Dynadot results.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache(object):
+    """
+    Thread-safe TTL + LRU cache of per-domain ``get_ns`` and ``search``
+    results. Only definitive results are stored; failures such as
+    ``offline`` or ``system_busy`` always go back to the API.
+    """
+    DEFAULT_TTL = {"get_ns": 300, "search": 60}
+    CACHEABLE_RESULTS = {
+        "get_ns": ("success",),
+        "search": ("yes", "no"),
+    }
+
+    def __init__(self, max_entries=10000, ttl=None):
+        """
+        :param max_entries: Maximum number of results kept. The least
+            recently used entry is evicted first.
+        :param ttl: `dict` of command name to seconds a result stays fresh.
+            Commands left out use ``DEFAULT_TTL``.
+        """
+        self.max_entries = max_entries
+        self.ttl = dict(self.DEFAULT_TTL, **(ttl or {}))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, command, domain):
+        """Return the cached result, or None if missing or expired."""
+        key = (command, domain.lower())
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[0] < time.time():
+                self.misses += 1
+                return None
+
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[1].copy()
+
+    def set(self, command, domain, result):
+        """Store a result if it is one that may be cached."""
+        if result.get("result") not in self.CACHEABLE_RESULTS.get(command, ()):
+            return
+
+        key = (command, domain.lower())
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + self.ttl[command], result.copy())
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, domain):
+        """Drop every cached result for a domain."""
+        domain = domain.lower()
+        with self._lock:
+            for command in self.CACHEABLE_RESULTS:
+                self._entries.pop((command, domain), None)
+
+    def clear(self):
+        """Drop all cached results and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return a `dict` of hit, miss, eviction and entry counts."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+        }
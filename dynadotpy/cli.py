@@ -0,0 +1,251 @@
+"""
+Command line interface.
+
+    dynadotpy search wordlist.txt --output results.jsonl --processes 4
+
+Domains are read one per line from a file or stdin. Results are written
+as they arrive, and progress is checkpointed so an interrupted run can be
+continued with ``--resume``.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from collections import OrderedDict
+from itertools import islice
+
+from dynadotpy.client import Dynadot
+
+CSV_FIELDS = ("domain", "result", "language", "info")
+BATCH_SIZE = 100
+
+_client = None
+_threads = 1
+
+
+def normalize(line):
+    """Return the ASCII form of a domain line, or None to skip it."""
+    domain = line.strip().lower().rstrip(".")
+    if not domain or domain.startswith("#"):
+        return None
+    try:
+        return domain.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+
+
+class RecentSet(object):
+    """Remembers the last ``size`` names seen, to drop duplicates."""
+
+    def __init__(self, size):
+        self.size = size
+        self._seen = OrderedDict()
+
+    def add(self, name):
+        """Add ``name``. Returns False if it was already seen."""
+        if name in self._seen:
+            return False
+        self._seen[name] = None
+        if len(self._seen) > self.size:
+            self._seen.popitem(last=False)
+        return True
+
+
+def _init_worker(api_key, api_url, threads):
+    global _client, _threads
+    _client = Dynadot(api_key=api_key, pool_maxsize=threads)
+    if api_url:
+        _client.API_URL = api_url
+    _threads = threads
+
+
+def _search_worker(domains):
+    """
+    Search a task's domains. Returns the result dicts and the domains
+    whose 100-domain search failed, which get ``error`` rows.
+    """
+    results = []
+    failed = []
+    for number, result in _client.bulk_search(domains, max_workers=_threads,
+            batch_size=BATCH_SIZE):
+        if "error" in result and "result" not in result:
+            batch = domains[number * BATCH_SIZE:(number + 1) * BATCH_SIZE]
+            failed.extend(batch)
+            results.extend({"domain": domain, "result": "error",
+                "language": "", "info": result["error"]} for domain in batch)
+            continue
+        results.append({"domain": result["domain"], "result": result["result"],
+            "language": result["language"], "info": result["info"]})
+    return results, failed
+
+
+class Writer(object):
+    """Writes result dicts as JSON lines or CSV."""
+
+    def __init__(self, fp, fmt, header):
+        self.fp = fp
+        self.csv = None
+        if fmt == "csv":
+            self.csv = csv.DictWriter(fp, fieldnames=CSV_FIELDS)
+            if header:
+                self.csv.writeheader()
+
+    def write(self, result):
+        if self.csv is not None:
+            self.csv.writerow(result)
+        else:
+            self.fp.write(json.dumps(result, sort_keys=True) + "\n")
+
+    def flush(self):
+        self.fp.flush()
+        if self.fp is not sys.stdout:
+            os.fsync(self.fp.fileno())
+
+
+def read_checkpoint(path):
+    try:
+        with open(path) as fp:
+            return json.load(fp)
+    except (IOError, OSError, ValueError):
+        return {"lines": 0}
+
+
+def write_checkpoint(path, lines, offset=None, failed=()):
+    """
+    Save the number of input lines done, the size the output had right
+    after their results, so a resumed run can cut off anything later, and
+    the domains whose search failed, so it can retry them.
+    """
+    tmp = path + ".tmp"
+    with open(tmp, "w") as fp:
+        json.dump({"lines": lines, "offset": offset, "failed": list(failed)},
+            fp)
+    getattr(os, "replace", os.rename)(tmp, path)
+
+
+def search(args):
+    api_key = args.api_key or os.environ.get("DYNADOT_API_KEY")
+    if not api_key:
+        sys.exit("An API key is required, use --api-key or DYNADOT_API_KEY.")
+
+    checkpoint = args.checkpoint or (
+        args.output + ".checkpoint" if args.output else None)
+    skip = 0
+    offset = None
+    retry = []
+    if args.resume:
+        if not checkpoint:
+            sys.exit("--resume needs --output or --checkpoint.")
+        state = read_checkpoint(checkpoint)
+        skip = state["lines"]
+        offset = state.get("offset")
+        retry = state.get("failed", [])
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    if args.output:
+        exists = os.path.exists(args.output)
+        if skip and exists and offset is not None:
+            # Drop rows written after the checkpoint by the interrupted
+            # run; they are searched again.
+            with open(args.output, "r+b") as fp:
+                fp.truncate(offset)
+        out = open(args.output, "a" if skip else "w")
+        header = not (skip and exists)
+    else:
+        out, header = sys.stdout, True
+    writer = Writer(out, args.format, header)
+
+    seen = RecentSet(args.dedupe_window)
+    lines = enumerate(source, 1)
+    for _ in islice(lines, skip):
+        pass
+
+    task_size = args.threads * BATCH_SIZE
+    window = task_size * args.processes * 4
+    failed = []
+    pool = multiprocessing.Pool(args.processes, _init_worker,
+        (api_key, args.api_url, args.threads))
+    try:
+        done = skip
+        while True:
+            if retry:
+                # Domains that failed before the run was resumed.
+                domains = [domain for domain in retry if seen.add(domain)]
+                retry = []
+            else:
+                chunk = list(islice(lines, window))
+                if not chunk:
+                    break
+                done = chunk[-1][0]
+
+                domains = []
+                for _, line in chunk:
+                    domain = normalize(line)
+                    if domain is not None and seen.add(domain):
+                        domains.append(domain)
+
+            tasks = [domains[start:start + task_size]
+                for start in range(0, len(domains), task_size)]
+            for results, task_failed in pool.imap_unordered(_search_worker,
+                    tasks):
+                failed.extend(task_failed)
+                for result in results:
+                    writer.write(result)
+            writer.flush()
+
+            if checkpoint:
+                write_checkpoint(checkpoint, done,
+                    None if out is sys.stdout else out.tell(), failed)
+    finally:
+        pool.terminate()
+        if out is not sys.stdout:
+            out.close()
+        if source is not sys.stdin:
+            source.close()
+
+    if failed:
+        sys.stderr.write("%d domains could not be searched.%s\n" % (
+            len(failed), " Run again with --resume to retry them."
+            if checkpoint else ""))
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="dynadotpy",
+        description="Command line tools for the Dynadot.com API v2.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    search_parser = subparsers.add_parser("search",
+        help="Check availability of domains from a file or stdin.")
+    search_parser.add_argument("input", nargs="?", default="-",
+        help="File with one domain per line, - for stdin.")
+    search_parser.add_argument("--output", "-o",
+        help="File to write results to. Defaults to stdout.")
+    search_parser.add_argument("--format", choices=("jsonl", "csv"),
+        default="jsonl")
+    search_parser.add_argument("--processes", type=int, default=2)
+    search_parser.add_argument("--threads", type=int, default=4,
+        help="Concurrent 100-domain searches per process.")
+    search_parser.add_argument("--dedupe-window", type=int, default=1000000,
+        help="Number of recent domains remembered to drop duplicates.")
+    search_parser.add_argument("--checkpoint",
+        help="Checkpoint file. Defaults to OUTPUT.checkpoint.")
+    search_parser.add_argument("--resume", action="store_true",
+        help="Continue from the checkpoint of an interrupted run.")
+    search_parser.add_argument("--api-key",
+        help="Dynadot API key. Defaults to $DYNADOT_API_KEY.")
+    search_parser.add_argument("--api-url", help=argparse.SUPPRESS)
+    search_parser.set_defaults(func=search)
+
+    args = parser.parse_args(argv)
+    if not getattr(args, "func", None):
+        parser.print_help()
+        return 2
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,11 @@
-import requests
+from collections import OrderedDict
+from itertools import islice
+import os
+import threading
+import time
+
+from dynadotpy.results import (NameserversResult, RegistrationResult, Result,
+    SearchResult)
 
 
 DELETE_RESPONSES = {
@@ -58,16 +65,470 @@ SET_RENEW_RESPONSES = {
     "error": "There was a syntax error processing this request."
 }
 
+COMMAND_RESPONSES = {
+    "delete": DELETE_RESPONSES,
+    "get_ns": GET_NAMESERVERS_RESPONSES,
+    "register": REGISTER_RESPONSES,
+    "renew": RENEW_RESPONSES,
+    "search": SEARCH_RESPONSES,
+    "set_folder": SET_FOLDER_RESPONSES,
+    "set_ns": SET_NAMESERVERS_RESPONSES,
+    "set_renew_option": SET_RENEW_RESPONSES,
+}
+
+STATUS_CODES = {code: code
+    for responses in COMMAND_RESPONSES.values() for code in responses}
+
+OFFLINE_COMMANDS = frozenset(command
+    for command, responses in COMMAND_RESPONSES.items() if "offline" in responses)
+
+
+def intern_status(code):
+    """
+    Return the shared instance of a known result code, so millions of
+    results do not each hold their own copy of ``"success"``.
+    """
+    return STATUS_CODES.get(code, code)
+
+
+class RequestInfo(object):
+    """What happened during one request, passed to post_request hooks."""
+    __slots__ = ("command", "params", "wait_time", "elapsed", "check_time",
+        "chars", "results", "error")
 
-class Dynadot(object):
-    """A simple Python wrapper for the Dynadot.com API v2."""
+    def __init__(self, command, params):
+        self.command = command
+        self.params = params
+        self.wait_time = 0.0
+        self.elapsed = 0.0
+        self.check_time = 0.0
+        self.chars = 0
+        self.results = ()
+        self.error = None
+
+    def __repr__(self):
+        return "<RequestInfo %s %.3fs %r>" % (self.command, self.elapsed,
+            self.results)
+
+
+class BaseClient(object):
+    """
+    Command tables, request params and response parsing shared by
+    :class:`Dynadot` and :class:`dynadotpy.aio.AsyncDynadot`. Sending
+    requests is left to the subclasses.
+    """
     API_URL = "https://api.dynadot.com/api2.html"
     API_KEY = None
     RENEW_OPTIONS = ("reset", "donot", "auto")
+    COMMANDS = {
+        "delete": "delete",
+        "get_nameservers": "get_ns",
+        "register": "register",
+        "renew": "renew",
+        "search": "search",
+        "set_folder": "set_folder",
+        "set_nameservers": "set_ns",
+        "set_renew_option": "set_renew_option",
+    }
+    profiler = None
+    compact_results = False
+
+    def _chunks(self, iterable, size):
+        """Yield lists of up to ``size`` items, stripped of whitespace."""
+        iterator = iter(iterable)
+        while True:
+            chunk = [item.strip() for item in islice(iterator, size)]
+            if not chunk:
+                return
+            yield chunk
+
+    def _check_response_status(self, response):
+        """Check response for errors."""
+        response_list = response.split("\n")
+        status = response_list[0].split(",")
+
+        if "error" in status:
+            return status
+
+        return response_list[2:-1]
+
+    def _check_renew_option(self, option):
+        """Raise if ``option`` is not a valid renewal option."""
+        if option not in self.RENEW_OPTIONS:
+            raise Exception("Invalid renewal option. Options are: [%s]" % (
+                ", ".join(self.RENEW_OPTIONS)))
+
+    def _error_response(self, response):
+        """Return error responses."""
+        return {response[0]: response[1]}
 
-    def __init__(self, api_key, *args, **kwargs):
+    def _nameserver_params(self, nameservers, normalize=None):
+        """
+        Validate nameservers and build the nsN request params.
+
+        :param normalize: Optional callable that cleans up the list, such
+            as removing duplicates, before its length is checked.
+        """
+        if not isinstance(nameservers, list):
+            raise TypeError("nameservers arg must be a [list].")
+
+        if normalize is not None:
+            nameservers = normalize(nameservers)
+        if len(nameservers) > 13:
+            raise Exception("Too many name servers. Dynadot only allows up to "
+                "13 name servers.")
+
+        return {"ns%d" % num: ns for num, ns in enumerate(nameservers)}
+
+    def _parse_delete_results(self, result):
+        """Parse delete result."""
+        return Result(intern_status(result[0]), result[1])
+
+    def _parse_get_nameservers_results(self, result):
+        """Parse nameserver result."""
+        if result[0] != "success":
+            return NameserversResult(intern_status(result[0]), result[1])
+
+        nameservers = result[1:14]
+        while nameservers and not nameservers[-1]:
+            nameservers.pop()
+        return NameserversResult(intern_status(result[0]), result[14],
+            tuple(nameservers))
+
+    def _parse_register_renew_results(self, result):
+        """Parse registration result."""
+        return RegistrationResult(intern_status(result[0]), result[1],
+            result[2])
+
+    def _parse_search_results(self, results):
+        """Parse search results."""
+        search_results = []
+        status = STATUS_CODES.get
+
+        for result in results:
+            result = result.split(",")
+            search_results.append(SearchResult(result[0], result[1],
+                result[2], status(result[3], result[3]), result[4]))
+        return search_results
+
+    def _parse_set_folder_results(self, result):
+        """Parse set folder result."""
+        return Result(intern_status(result[0]), result[1])
+
+    def _parse_set_nameservers_results(self, result):
+        """Parse set name servers result."""
+        return Result(intern_status(result[0]), result[1])
+
+    def _parse_set_renew_option_results(self, result):
+        """Parse set renew option result."""
+        return Result(intern_status(result[0]), result[1])
+
+    def _result(self, command, response, parser):
+        """Return the error response, or the single result line parsed."""
+        if "error" in response:
+            return self._error_response(response)
+
+        if self.profiler is None:
+            return parser(response[0].split(","))
+        started = time.time()
+        result = parser(response[0].split(","))
+        self.profiler.record_parse(command, time.time() - started)
+        return result
+
+    def _public(self, result):
+        """
+        Return a result as callers get it: plain dicts, unless
+        ``compact_results`` is set. Error responses are dicts already.
+        """
+        if self.compact_results or isinstance(result, dict):
+            return result
+        if isinstance(result, list):
+            return [item.as_dict() for item in result]
+        return result.as_dict()
+
+    def _result_codes(self, command, response):
+        """Return the result code of every line in a checked response."""
+        if "error" in response:
+            return ["error"]
+
+        if command == "search":
+            return [line.split(",")[3] for line in response if line]
+        return [line.split(",", 1)[0] for line in response]
+
+    def _search_params(self, domains):
+        """Validate domains and build the domainN request params."""
+        if not isinstance(domains, list):
+            raise TypeError("Search requires a [list] of domains.")
+
+        if len(domains) > 100:
+            raise Exception("Too many domain names. Dynadot only allows up to"
+                "100 domains.")
+
+        return {"domain%d" % num: domain for num, domain in enumerate(domains)}
+
+    def _search_result(self, response):
+        """Return the error response, or the parsed search results."""
+        if "error" in response:
+            return self._error_response(response)
+
+        if self.profiler is None:
+            return self._parse_search_results(results=response)
+        started = time.time()
+        results = self._parse_search_results(results=response)
+        self.profiler.record_parse("search", time.time() - started)
+        return results
+
+
+class Dynadot(BaseClient):
+    """
+    A simple Python wrapper for the Dynadot.com API v2.
+
+    One client can be shared by any number of threads. The API key and
+    options are only read after construction. Each request builds its own
+    params, and the transport, cache, rate limiter, retry policy, circuit
+    breaker and store lock their own state. :attr:`last_retry` is kept per
+    thread. Add hooks before sharing the client, and make them thread-safe.
+    For several accounts use :class:`dynadotpy.accounts.AccountPool`.
+    """
+
+    def __init__(self, api_key, pool_connections=1, pool_maxsize=10,
+                 pool_block=False, keep_alive=True, timeout=None, cache=None,
+                 rate_limiter=None, retry_policy=None, store=None,
+                 coalesce=False, coalesce_window=0.005, validate=False,
+                 tlds=None, circuit_breaker=None, transport=None, journal=None,
+                 compact_results=False, *args, **kwargs):
+        """
+        :param api_key: String of your Dynadot API key.
+        :param pool_connections: Number of per-host connection pools to keep.
+        :param pool_maxsize: Maximum connections kept open per host. Set
+            this to at least the number of threads sharing the client.
+        :param pool_block: Block when the pool is exhausted instead of
+            opening throwaway connections.
+        :param keep_alive: Reuse connections between commands.
+        :param timeout: Seconds to wait for the API before giving up.
+        :param cache: Optional :class:`dynadotpy.cache.ResultCache` for
+            ``get_nameservers`` and ``search`` results.
+        :param rate_limiter: Optional
+            :class:`dynadotpy.ratelimit.RateLimiter`, may be shared between
+            clients.
+        :param retry_policy: Optional :class:`dynadotpy.retry.RetryPolicy`
+            for transient failures.
+        :param store: Optional :class:`dynadotpy.store.DomainStore` that
+            successful commands are recorded in.
+        :param coalesce: Share one request between threads asking for the
+            same ``get_nameservers`` or ``search`` at the same time, and
+            merge concurrent single-domain searches.
+        :param coalesce_window: Seconds a single-domain search waits for
+            others to merge with.
+        :param validate: Check and normalize domains and nameservers for
+            ``register``, ``search`` and ``set_nameservers`` before sending
+            them, and skip ``set_nameservers`` calls that would not change
+            the cached nameservers.
+        :param tlds: Optional set of TLDs ``validate`` accepts, such as
+            :data:`dynadotpy.validation.TLDS`. Defaults to any TLD.
+        :param circuit_breaker: Optional
+            :class:`dynadotpy.breaker.CircuitBreaker` that fails commands
+            for TLDs whose registry keeps answering ``offline`` locally.
+        :param transport: Optional :class:`dynadotpy.transport.Transport`
+            that sends requests. Defaults to a
+            :class:`dynadotpy.transport.RequestsTransport` built from the
+            pool options, which are ignored when a transport is given.
+        :param journal: Optional :class:`dynadotpy.journal.Journal` that
+            commands changing the account are recorded in before they are
+            sent. See :meth:`resume_journal`.
+        :param compact_results: Return the read-only result objects of
+            :mod:`dynadotpy.results` instead of `dict` results. They use
+            less memory but are not JSON serializable or mutable.
+        """
         self.API_KEY = api_key
-        self.payload = {"key": self.API_KEY}
+        self.timeout = timeout
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.store = store
+        self.validate = validate
+        self.tlds = tlds
+        self.circuit_breaker = circuit_breaker
+        self.journal = journal
+        self.compact_results = compact_results
+        self.profiler = None
+
+        self.flight = None
+        self.search_batcher = None
+        if coalesce:
+            from dynadotpy.coalesce import SearchBatcher, SingleFlight
+            self.flight = SingleFlight()
+            self.search_batcher = SearchBatcher(self._search,
+                window=coalesce_window)
+        self.hooks = {"pre_request": [], "post_request": []}
+        self._local = threading.local()
+
+        if transport is None:
+            from dynadotpy.transport import RequestsTransport
+            transport = RequestsTransport(pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize, pool_block=pool_block,
+                keep_alive=keep_alive)
+        self.transport = transport
+
+    @classmethod
+    def from_env(cls, environ=None, **kwargs):
+        """
+        Build a client from environment variables:
+
+        * ``DYNADOT_API_KEY`` - Your API key. Required.
+        * ``DYNADOT_API_URL`` - Overrides :attr:`API_URL`.
+        * ``DYNADOT_TIMEOUT`` - Seconds to wait for the API.
+        * ``DYNADOT_POOL_MAXSIZE`` - Maximum connections kept open.
+        * ``DYNADOT_TRANSPORT`` - ``requests`` or ``urllib3``.
+
+        :param environ: Mapping to read instead of ``os.environ``.
+        :param kwargs: Other arguments for the client. These take
+            precedence over the environment.
+        """
+        if environ is None:
+            environ = os.environ
+
+        api_key = kwargs.pop("api_key", None) or environ.get("DYNADOT_API_KEY")
+        if not api_key:
+            raise ValueError("DYNADOT_API_KEY is not set.")
+        if environ.get("DYNADOT_TIMEOUT"):
+            kwargs.setdefault("timeout", float(environ["DYNADOT_TIMEOUT"]))
+        if environ.get("DYNADOT_POOL_MAXSIZE"):
+            kwargs.setdefault("pool_maxsize",
+                int(environ["DYNADOT_POOL_MAXSIZE"]))
+
+        name = environ.get("DYNADOT_TRANSPORT")
+        if name and "transport" not in kwargs:
+            from dynadotpy import transport
+            transports = {"requests": transport.RequestsTransport,
+                "urllib3": transport.Urllib3Transport}
+            if name not in transports:
+                raise ValueError("Unknown DYNADOT_TRANSPORT: %s" % name)
+            kwargs["transport"] = transports[name](
+                pool_connections=kwargs.get("pool_connections", 1),
+                pool_maxsize=kwargs.get("pool_maxsize", 10),
+                pool_block=kwargs.get("pool_block", False),
+                keep_alive=kwargs.get("keep_alive", True))
+
+        client = cls(api_key, **kwargs)
+        if environ.get("DYNADOT_API_URL"):
+            client.API_URL = environ["DYNADOT_API_URL"]
+        return client
+
+    @property
+    def last_retry(self):
+        """
+        :class:`dynadotpy.retry.RetryStats` of the last command called by
+        the current thread, also when it raised. None without a retry
+        policy, or when the command sent no request itself, such as a
+        cache hit, a coalesced call, a validation error or an open circuit.
+        """
+        return getattr(self._local, "last_retry", None)
+
+    def add_hook(self, event, hook):
+        """Register a request hook.
+
+        ``pre_request`` hooks are called as ``hook(command, params)`` before
+        every request, retries included. ``post_request`` hooks are called
+        as ``hook(info)`` with a :class:`RequestInfo` after it finished or
+        raised. Hooks run in the calling thread and must be thread-safe.
+
+        :param event: ``"pre_request"`` or ``"post_request"``.
+        :param hook: Callable to register.
+        """
+        self.hooks[event].append(hook)
+
+    def remove_hook(self, event, hook):
+        """Unregister a hook added with :meth:`add_hook`."""
+        self.hooks[event].remove(hook)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close all pooled connections held by this client."""
+        self.transport.close()
+
+    def batch(self, operations, max_workers=8):
+        """Run many commands on a worker pool, streaming results.
+
+        ::
+            >>> from dynadotpy.client import Dynadot
+            >>> dyn = Dynadot(api_key="<key>", pool_maxsize=8)
+            >>> ops = [("set_renew_option", {"domain": d, "option": "auto"})
+            ...     for d in domains]
+            >>> for op in dyn.batch(ops):
+            ...     print(op.index, op.status, op.latency)
+            0 success 0.21
+
+        :param operations: Iterable of ``(command, kwargs)`` tuples, where
+            command is a method name such as ``"set_nameservers"``.
+        :param max_workers: Number of worker threads.
+        :return: Generator of
+            :class:`dynadotpy.batch.OperationResult` in completion order.
+        """
+        from dynadotpy.batch import BatchExecutor
+        return BatchExecutor(self, max_workers=max_workers).run(operations)
+
+    def bulk_search(self, domains, max_workers=4, batch_size=100):
+        """Search any number of domains in concurrent batches.
+
+        Domains are read lazily from ``domains`` (any iterable, including
+        generators) and sent in batches of up to ``batch_size`` names. At
+        most ``max_workers`` batches are in flight at once, so memory use
+        stays flat regardless of input size. Results are yielded as each
+        batch finishes, which may not be input order.
+
+        ::
+            >>> from dynadotpy.client import Dynadot
+            >>> dyn = Dynadot(api_key="<key>")
+            >>> for batch, result in dyn.bulk_search(open("names.txt")):
+            ...     print(batch, result["domain"], result["result"])
+            0 example.com no
+
+        :param domains: Iterable of domains you want to search for.
+        :param max_workers: Number of batches to run concurrently.
+        :param batch_size: Domains per search call, up to 100.
+        :return: Generator of ``(batch_number, result)`` tuples. Batch
+            numbers count from 0 in input order. A failed batch, including
+            one whose request raised, yields a single error dict and the
+            other batches carry on.
+        """
+        from concurrent.futures import (FIRST_COMPLETED, ThreadPoolExecutor,
+            wait)
+
+        if batch_size > 100:
+            raise Exception("Too many domain names. Dynadot only allows up to"
+                "100 domains.")
+
+        batches = enumerate(self._chunks(domains, batch_size))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+            for number, batch in islice(batches, max_workers):
+                pending[executor.submit(self.search, batch)] = number
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    number = pending.pop(future)
+                    for next_number, batch in islice(batches, 1):
+                        pending[executor.submit(self.search, batch)] = (
+                            next_number)
+
+                    try:
+                        results = future.result()
+                    except Exception as exc:
+                        results = {"error": str(exc) or
+                            exc.__class__.__name__}
+                    if isinstance(results, dict):
+                        yield number, results
+                        continue
+                    for result in results:
+                        yield number, result
 
     def delete(self, domain):
         """Delete a domain.
@@ -81,12 +542,12 @@ class Dynadot(object):
         :param domain: String of the domain.
         :return: `dict` of the response from Dynadot's API.
         """
+        self._local.last_retry = None
         response = self._send_command(command="delete", domain=domain)
-
-        if "error" in response:
-            return self._error_response(response)
-
-        return self._parse_delete_results(response[0].split(","))
+        self._invalidate(domain)
+        result = self._result("delete", response, self._parse_delete_results)
+        self._store_result("delete", domain, result)
+        return self._public(result)
 
     def get_nameservers(self, domain):
         """Get Nameservers for the given domain.
@@ -100,12 +561,27 @@ class Dynadot(object):
         :param: String of the domain.
         :return: `dict` of the response from Dynadot's API.
         """
+        self._local.last_retry = None
+        if self.cache is not None:
+            cached = self.cache.get("get_ns", domain)
+            if cached is not None:
+                return self._public(cached)
+
+        if self.flight is not None:
+            return self._public(self.flight.do(("get_ns", domain.lower()),
+                lambda: self._get_nameservers(domain)))
+        return self._public(self._get_nameservers(domain))
+
+    def _get_nameservers(self, domain):
+        """Fetch nameservers from the API and record the result."""
         response = self._send_command(command="get_ns", domain=domain)
+        result = self._result("get_ns", response,
+            self._parse_get_nameservers_results)
 
-        if "error" in response:
-            return self._error_response(response)
-
-        return self._parse_get_nameservers_results(response[0].split(","))
+        if self.cache is not None:
+            self.cache.set("get_ns", domain, result)
+        self._store_result("get_ns", domain, result)
+        return self._public(result)
 
     def register(self, domain, duration):
         """Register a domain.
@@ -120,13 +596,21 @@ class Dynadot(object):
         :param: String/int of the duration in years you wish to register.
         :return: `dict` of the response from Dynadot's API.
         """
+        self._local.last_retry = None
+        if self.validate:
+            from dynadotpy.validation import normalize_domain
+            try:
+                domain = normalize_domain(domain, self.tlds)
+            except ValueError as exc:
+                return {"error": str(exc)}
+
         response = self._send_command(command="register", domain=domain,
             duration=duration)
-
-        if "error" in response:
-            return self._error_response(response)
-
-        return self._parse_register_renew_results(response[0].split(","))
+        self._invalidate(domain)
+        result = self._result("register", response,
+            self._parse_register_renew_results)
+        self._store_result("register", domain, result)
+        return self._public(result)
 
     def renew(self, domain, duration):
         """Renew a domain.
@@ -141,13 +625,50 @@ class Dynadot(object):
         :param: String/int of the duration in years you wish to register.
         :return: `dict` of the response from Dynadot's API.
         """
+        self._local.last_retry = None
         response = self._send_command(command="renew", domain=domain,
             duration=duration)
+        result = self._result("renew", response,
+            self._parse_register_renew_results)
+        self._store_result("renew", domain, result)
+        return self._public(result)
 
-        if "error" in response:
-            return self._error_response(response)
+    def resume_journal(self, replay_unsafe=False, max_workers=8):
+        """Replay the commands the journal has no outcome for.
+
+        Commands that can safely be sent twice are sent again. A
+        ``register`` is first checked with ``get_ns``: if the domain is
+        already in the account it is marked ``verified`` instead of being
+        bought again. A ``renew`` cannot be checked and is ``skipped``
+        unless ``replay_unsafe`` is set, since it may already have been
+        charged.
+
+        ::
+            >>> from dynadotpy.client import Dynadot
+            >>> from dynadotpy.journal import Journal
+            >>> dyn = Dynadot(api_key="<key>", journal=Journal("ops.jsonl"))
+            >>> report = dyn.resume_journal()
+            >>> report.statuses
+            {'success': 41, 'verified': 2, 'skipped': 1}
+
+        :param replay_unsafe: Also replay ``renew``.
+        :param max_workers: Number of commands replayed at the same time.
+        :return: :class:`dynadotpy.batch.BatchReport` with an
+            :class:`dynadotpy.batch.OperationResult` per command, indexed
+            by journal id. ``result`` holds the response lines.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from dynadotpy.batch import BatchReport
 
-        return self._parse_register_renew_results(response[0].split(","))
+        if self.journal is None:
+            raise ValueError("This client has no journal.")
+
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(
+                lambda record: self._resume_entry(record, replay_unsafe),
+                self.journal.incomplete()))
+        return BatchReport(results, time.time() - started)
 
     def search(self, domains):
         """Search for available domains.
@@ -163,20 +684,84 @@ class Dynadot(object):
         :param: `list` of domains you want to search for.
         :return: `list` of `dicts` for each domain searched.
         """
-        if not isinstance(domains, list):
-            raise TypeError("Search requires a [list] of domains.")
-
-        if len(domains) > 100:
-            raise Exception("Too many domain names. Dynadot only allows up to"
-                "100 domains.")
-
-        response = self._send_command(command="search",
-            **{"domain%d" % num: domain for num, domain in enumerate(domains)})
+        self._local.last_retry = None
+        self._search_params(domains)
+        if self.validate:
+            return self._public(self._validated_search(domains))
+        return self._public(self._lookup_search(domains))
+
+    def iter_search(self, domains):
+        """Search for available domains, streaming the response.
+
+        Results are parsed and yielded while the response body is still
+        downloading. The request goes through the ``pre_request`` and
+        ``post_request`` hooks, the rate limiter and the circuit breaker
+        like any other search. Domains whose circuit is open are answered
+        ``offline`` locally, in their place in the list.
+
+        Unlike :meth:`search`, streaming responses skip the retry policy,
+        the cache, coalescing, ``validate``, the journal and the profiler.
+        The ``elapsed`` time passed to ``post_request`` hooks runs until
+        the last line is read, so it includes the time the caller spends
+        between records.
 
-        if "error" in response:
-            return self._error_response(response)
+        ::
+            >>> from dynadotpy.client import Dynadot
+            >>> dyn = Dynadot(api_key="<key>")
+            >>> for record in dyn.iter_search(["example.com"]):
+            ...     print(record["domain"], record["result"])
+            example.com no
 
-        return self._parse_search_results(results=response)
+        :param: `list` of domains you want to search for.
+        :return: Generator of a `dict`, or with ``compact_results`` a
+            :class:`dynadotpy.results.SearchResult`, per domain. A failed
+            request yields a single error dict and stops.
+        """
+        self._local.last_retry = None
+
+        kwargs = self._search_params(domains)
+        kwargs["command"] = "search"
+        keys = ["domain%d" % num for num in range(len(domains))]
+
+        blocked = []
+        request, sent, tlds = kwargs, keys, set()
+        if self.circuit_breaker is not None:
+            from dynadotpy.breaker import tld_of
+
+            key_tlds = {key: tld_of(kwargs[key]) for key in keys}
+            allowed = {tld: self.circuit_breaker.allow(tld)
+                for tld in set(key_tlds.values())}
+            blocked = self._parse_search_results(results=[
+                "%s,%s,,offline,Circuit open for .%s" % (key, kwargs[key],
+                    key_tlds[key])
+                for key in keys if not allowed[key_tlds[key]]])
+            if blocked:
+                sent = [key for key in keys if allowed[key_tlds[key]]]
+                request = {"command": "search"}
+                for num, key in enumerate(sent):
+                    request["domain%d" % num] = kwargs[key]
+            tlds = set(key_tlds[key] for key in sent)
+
+        offline = iter(blocked)
+        pending = next(offline, None)
+        if sent:
+            for record in self._streamed_search(request, tlds):
+                if isinstance(record, dict):
+                    yield record
+                    return
+                if blocked:
+                    record = record.copy()
+                    record.domain_param = sent[int(record.domain_param[6:])]
+                    position = int(record.domain_param[6:])
+                    while (pending is not None and
+                            int(pending.domain_param[6:]) < position):
+                        yield self._public(pending)
+                        pending = next(offline, None)
+                yield self._public(record)
+
+        while pending is not None:
+            yield self._public(pending)
+            pending = next(offline, None)
 
     def set_folder(self, domain, folder):
         """
@@ -197,13 +782,13 @@ class Dynadot(object):
         :param: String of the folder you want to move the domain to.
         :return: `dict` of the response from Dynadot's API.
         """
+        self._local.last_retry = None
         response = self._send_command(command="set_folder", domain=domain,
             folder=folder)
-
-        if "error" in response:
-            return self._error_response(response)
-
-        return self._parse_set_folder_results(response[0].split(","))
+        result = self._result("set_folder", response,
+            self._parse_set_folder_results)
+        self._store_result("set_folder", domain, result, folder)
+        return self._public(result)
 
     def set_nameservers(self, domain, nameservers):
         """Set nameservers for the given domain.
@@ -219,20 +804,29 @@ class Dynadot(object):
         :param: `list` of name servers you wish to set.
         :return: `dict` of the response from Dynadot's API.
         """
-        if not isinstance(nameservers, list):
-            raise TypeError("nameservers arg must be a [list].")
-
-        if len(nameservers) > 13:
-            raise Exception("Too many name servers. Dynadot only allows up to "
-                "13 name servers.")
+        self._local.last_retry = None
+        if not self.validate:
+            params = self._nameserver_params(nameservers)
+        else:
+            from dynadotpy.validation import (normalize_domain,
+                normalize_nameservers)
+            try:
+                params = self._nameserver_params(nameservers,
+                    normalize_nameservers)
+                domain = normalize_domain(domain, self.tlds)
+            except ValueError as exc:
+                return {"error": str(exc)}
+
+            if self._nameservers_unchanged(domain, params.values()):
+                return self._public(Result(intern_status("success"), ""))
 
         response = self._send_command(command="set_ns", domain=domain,
-            **{"ns%d" % num: ns for num, ns in enumerate(nameservers)})
-
-        if "error" in response:
-            return self._error_response(response)
-
-        return self._parse_set_nameservers_results(response[0].split(","))
+            **params)
+        self._invalidate(domain)
+        result = self._result("set_ns", response,
+            self._parse_set_nameservers_results)
+        self._store_result("set_ns", domain, result)
+        return self._public(result)
 
     def set_renew_option(self, domain, option):
         """Set domain renewal options.
@@ -252,102 +846,419 @@ class Dynadot(object):
         :param: String of the option you wish to set for the domain.
         :return: `dict` of the response from Dynadot's API.
         """
-        if option not in self.RENEW_OPTIONS:
-            raise Exception("Invalid renewal option. Options are: [%s]" % (
-                ", ".join(self.RENEW_OPTIONS)))
+        self._local.last_retry = None
+        self._check_renew_option(option)
 
         response = self._send_command(command="set_renew_option",
             domain=domain, option=option)
+        result = self._result("set_renew_option", response,
+            self._parse_set_renew_option_results)
+        self._store_result("set_renew_option", domain, result, option)
+        return self._public(result)
+
+    def _cached_search(self, domains):
+        """Search only the domains missing from the cache."""
+        results = [self.cache.get("search", domain) for domain in domains]
+        missing = [num for num, result in enumerate(results) if result is None]
+
+        if missing:
+            fresh = self._coalesced_search([domains[num] for num in missing])
+            if isinstance(fresh, dict):
+                return fresh
+
+            for result in fresh:
+                num = missing[int(result["domain_param"][len("domain"):])]
+                results[num] = result
+                self.cache.set("search", domains[num], result)
+
+        # Cached results are shared with other threads, so renumber copies.
+        numbered = []
+        for result in results:
+            if result is not None:
+                result = result.copy()
+                result.domain_param = "domain%d" % len(numbered)
+                numbered.append(result)
+        return numbered
+
+    def _coalesced_search(self, domains):
+        """Search, sharing requests with other threads if enabled."""
+        if self.flight is None:
+            return self._search(domains)
+        if len(domains) == 1:
+            return self.search_batcher.search(domains[0])
+        results = self.flight.do(("search",) + tuple(domains),
+            lambda: self._search(domains))
+        # Every thread that shared the call gets its own results.
+        if isinstance(results, dict):
+            return dict(results)
+        return [result.copy() for result in results]
+
+    def _resume_entry(self, record, replay_unsafe):
+        """Replay, verify or skip one incomplete journal entry."""
+        from dynadotpy.batch import OperationResult
+
+        command, params = record["command"], record["params"]
+        operation = OperationResult(record["id"], command, params)
+        started = time.time()
+        try:
+            if command == "renew" and not replay_unsafe:
+                operation.status = "skipped"
+                operation.message = ("The renewal may already have been "
+                    "charged. Check the expiration date, or replay with "
+                    "replay_unsafe=True.")
+                return operation
+
+            if command == "register":
+                owned = self._get_nameservers(params["domain"])
+                if owned.get("result") == "success":
+                    self.journal.end(record["id"], ["verified"])
+                    operation.status = "verified"
+                    operation.message = "The domain is already in the account"
+                    operation.success = True
+                    return operation
+
+            response = self._journaled_command(record["id"], params)
+            if "domain" in params:
+                self._invalidate(params["domain"])
+            codes = self._result_codes(command, response)
+            status = codes[0] if codes else "error"
+            operation.result = response
+            operation.status = status
+            operation.success = status == "success"
+            operation.message = COMMAND_RESPONSES[command].get(status)
+        except Exception as exc:
+            operation.error = exc
+            operation.status = "exception"
+            operation.message = str(exc)
+        finally:
+            operation.latency = time.time() - started
+        return operation
+
+    def _invalidate(self, domain):
+        """Drop cached results for a domain after it was changed."""
+        if self.cache is not None:
+            self.cache.invalidate(domain)
+
+    def _lookup_search(self, domains):
+        """Search through the cache and coalescing, when enabled."""
+        if self.cache is not None:
+            return self._cached_search(domains)
+        return self._coalesced_search(domains)
+
+    def _nameservers_unchanged(self, domain, nameservers):
+        """True if the cached nameservers of a domain equal ``nameservers``."""
+        if self.cache is None:
+            return False
+
+        cached = self.cache.get("get_ns", domain)
+        if cached is None:
+            return False
+        return set(ns.lower() for ns in cached.nameservers if ns) == set(
+            nameservers)
+
+    def _validated_search(self, domains):
+        """
+        Search only valid, distinct domains. Invalid ones get a local
+        ``error`` result.
+        """
+        from dynadotpy.validation import normalize_names
 
-        if "error" in response:
-            return self._error_response(response)
-
-        return self._parse_set_renew_option_results(response[0].split(","))
-
-    def _check_response_status(self, response):
-        """Check response for errors."""
-        response_list = response.split("\n")
-        status = response_list[0].split(",")
-
-        if "error" in status:
-            return status
+        names, errors = normalize_names(domains, self.tlds)
+        unique = list(OrderedDict.fromkeys(name for name in names if name))
 
-        return response_list[2:-1]
+        found = {}
+        if unique:
+            results = self._lookup_search(unique)
+            if isinstance(results, dict):
+                return results
+            found = {result.domain: result for result in results}
 
-    def _error_response(self, response):
-        """Return error responses."""
-        return {response[0]: response[1]}
-
-    def _parse_delete_results(self, result):
-        """Parse delete result."""
-        return {
-            "result": result[0],
-            "more_info": result[1]
-        }
+        search_results = []
+        for num, (domain, name) in enumerate(zip(domains, names)):
+            if name is None:
+                result = SearchResult("", domain, "", intern_status("error"),
+                    errors[num])
+            elif name in found:
+                result = found[name].copy()
+            else:
+                continue
+            result.domain_param = "domain%d" % num
+            search_results.append(result)
+        return search_results
 
-    def _parse_get_nameservers_results(self, result):
-        """Parse nameserver result."""
-        if result[0] != "success":
-            return {"result": result[0], "more_info": result[1]}
+    def _search(self, domains):
+        """Send one search request."""
+        response = self._send_command(command="search",
+            **self._search_params(domains))
+        return self._search_result(response)
 
-        response = {"result": result[0], "more_info": result[14]}
-        for n in xrange(0, 13):
-            response.update({"ns%d" % n: result[n + 1]})
+    def _store_result(self, command, domain, result, value=None):
+        """Record a successful command in the domain store."""
+        if self.store is not None and result.get("result") == "success":
+            self.store.record(command, domain, result, value)
 
+    def _send_command(self, **kwargs):
+        """
+        Uses kwargs passed in to build a request to the Dynadot API,
+        retrying it according to ``retry_policy``.
+        :returns: Checked response lines
+        """
+        if self.journal is not None and kwargs["command"] in (
+                self.journal.commands):
+            entry = self.journal.begin(kwargs["command"], kwargs)
+            return self._journaled_command(entry, kwargs)
+        return self._dispatch_command(kwargs)
+
+    def _journaled_command(self, entry, kwargs):
+        """Send a command and record its outcome in the journal."""
+        try:
+            response = self._dispatch_command(kwargs)
+        except Exception as exc:
+            self.journal.end(entry, error=exc)
+            raise
+        self.journal.end(entry, self._result_codes(kwargs["command"], response))
         return response
 
-    def _parse_register_renew_results(self, result):
-        """Parse registration result."""
-        return {
-            "result": result[0],
-            "more_info": result[1],
-            "expiration_date": result[2]
-        }
-
-    def _parse_search_results(self, results):
-        """Parse search results."""
-        search_results = []
-
-        for result in results:
-            result = result.split(",")
-            if result:
-                search_results.append({
-                    "domain_param": result[0],
-                    "domain": result[1],
-                    "language": result[2],
-                    "result": result[3],
-                    "info": result[4]
-                })
-        return search_results
+    def _dispatch_command(self, kwargs):
+        """Send a command through the circuit breaker and retry policy."""
+        if (self.circuit_breaker is not None and
+                kwargs["command"] in OFFLINE_COMMANDS):
+            if kwargs["command"] == "search":
+                return self._guarded_search(kwargs)
+            return self._guarded_command(kwargs)
+        return self._retried_request(kwargs)
+
+    def _guarded_command(self, kwargs):
+        """Send a single-domain command unless its TLD's circuit is open."""
+        from dynadotpy.breaker import tld_of
+
+        command = kwargs["command"]
+        tld = tld_of(kwargs["domain"])
+        if not self.circuit_breaker.allow(tld):
+            line = "offline,Circuit open for .%s" % tld
+            if command in ("register", "renew"):
+                line += ","
+            return [line]
+
+        response = self._probed_request(kwargs, [tld])
+        if "error" not in response:
+            self.circuit_breaker.record(tld,
+                self._result_codes(command, response))
+        return response
 
-    def _parse_set_folder_results(self, result):
-        """Parse set folder result."""
-        return {
-            "result": result[0],
-            "more_info": result[1]
-        }
+    def _guarded_search(self, kwargs):
+        """
+        Search the domains whose TLD's circuit is closed, and answer
+        ``offline`` locally for the rest.
+        """
+        from dynadotpy.breaker import tld_of
+
+        params = sorted((key for key in kwargs if key.startswith("domain")),
+            key=lambda key: int(key[6:]))
+        tlds = {key: tld_of(kwargs[key]) for key in params}
+        allowed = {tld: self.circuit_breaker.allow(tld)
+            for tld in set(tlds.values())}
+        if all(allowed.values()):
+            response = self._probed_request(kwargs, allowed)
+            self._record_search(response)
+            return response
+
+        sent = [key for key in params if allowed[tlds[key]]]
+        lines = {}
+        if sent:
+            request = {"command": "search"}
+            for num, key in enumerate(sent):
+                request["domain%d" % num] = kwargs[key]
+            response = self._probed_request(request,
+                set(tlds[key] for key in sent))
+            if "error" in response:
+                return response
+            self._record_search(response)
+            for line in response:
+                if line:
+                    param, rest = line.split(",", 1)
+                    key = sent[int(param[6:])]
+                    lines[key] = "%s,%s" % (key, rest)
+
+        return [lines[key] if key in lines else
+            "%s,%s,,offline,Circuit open for .%s" % (key, kwargs[key],
+                tlds[key])
+            for key in params if key in lines or not allowed[tlds[key]]]
+
+    def _probed_request(self, kwargs, tlds):
+        """
+        Send a request through the circuit breaker, counting an exception
+        or error response as a failed probe for half-open ``tlds``.
+        """
+        try:
+            response = self._retried_request(kwargs)
+        except Exception:
+            for tld in tlds:
+                self.circuit_breaker.record_error(tld)
+            raise
+        if "error" in response:
+            for tld in tlds:
+                self.circuit_breaker.record_error(tld)
+        return response
 
-    def _parse_set_nameservers_results(self, result):
-        """Parse set name servers result."""
-        return {
-            "result": result[0],
-            "more_info": result[1]
-        }
+    def _record_search(self, response):
+        """Record the search results of each TLD in the circuit breaker."""
+        from dynadotpy.breaker import tld_of
 
-    def _parse_set_renew_option_results(self, result):
-        """Parse set renew option result."""
-        return {
-            "result": result[0],
-            "more_info": result[1]
-        }
+        if "error" in response:
+            return
+        results = {}
+        for line in response:
+            if line:
+                fields = line.split(",")
+                results.setdefault(tld_of(fields[1]), []).append(fields[3])
+        for tld, codes in results.items():
+            self.circuit_breaker.record(tld, codes)
+
+    def _retried_request(self, kwargs):
+        """Send a request, retrying it according to ``retry_policy``."""
+        if self.retry_policy is None:
+            return self._request(kwargs)
+
+        from dynadotpy.retry import RetryStats
+
+        stats = self._local.last_retry = RetryStats(kwargs["command"])
+        response, _ = self.retry_policy.run(kwargs["command"],
+            lambda: self._request(kwargs), self._result_codes, stats)
+        return response
 
-    def _send_command(self, **kwargs):
+    def _streamed_search(self, kwargs, tlds):
         """
-        Uses kwargs passed in to build a request to the Dynadot API.
-        :returns: Response text
+        Stream one search request, running the hooks and updating the rate
+        limiter and the circuit breaker of ``tlds`` once it is read, or
+        given up on.
         """
-        payload = self.payload.copy()
-        payload.update(**kwargs)
-
-        req = requests.get(self.API_URL, params=payload)
-        return self._check_response_status(req.text)
+        from dynadotpy import parser
+
+        command = kwargs["command"]
+        for hook in self.hooks["pre_request"]:
+            hook(command, kwargs)
+
+        info = None
+        if self.hooks["post_request"]:
+            info = RequestInfo(command, kwargs)
+
+        if self.rate_limiter is not None:
+            waited = self.rate_limiter.acquire(command)
+            if info is not None:
+                info.wait_time = waited
+
+        payload = dict(kwargs, key=self.API_KEY)
+        results = []
+        error = None
+        started = time.time()
+        chunks = self.transport.stream(self.API_URL, payload, self.timeout)
+        try:
+            lines = parser.iter_lines(chunks if info is None else
+                self._counted_chunks(chunks, info))
+            status = parser.read_status(lines)
+            if "error" in status:
+                results.append("error")
+                yield self._error_response(status)
+                return
+
+            for record in parser.iter_search_records(lines):
+                results.append(record)
+                yield record
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            chunks.close()
+            codes = [result if result == "error" else result.result
+                for result in results]
+            if self.rate_limiter is not None and error is None:
+                self.rate_limiter.update(command, codes)
+            if self.circuit_breaker is not None:
+                self._record_streamed(tlds, results,
+                    error is not None or "error" in codes)
+            if info is not None:
+                info.elapsed = time.time() - started
+                info.results = codes
+                info.error = error
+                self._post_request(info)
+
+    def _counted_chunks(self, chunks, info):
+        """Pass chunks through, adding their length to ``info.chars``."""
+        for chunk in chunks:
+            info.chars += len(chunk)
+            yield chunk
+
+    def _record_streamed(self, tlds, records, failed):
+        """Record a streamed search in the circuit breaker."""
+        from dynadotpy.breaker import tld_of
+
+        if failed:
+            for tld in tlds:
+                self.circuit_breaker.record_error(tld)
+            return
+        codes = {}
+        for record in records:
+            codes.setdefault(tld_of(record.domain), []).append(record.result)
+        for tld, tld_codes in codes.items():
+            self.circuit_breaker.record(tld, tld_codes)
+
+    def _post_request(self, info):
+        for hook in self.hooks["post_request"]:
+            hook(info)
+
+    def _request(self, kwargs):
+        """Send a single request to the Dynadot API."""
+        payload = dict(kwargs, key=self.API_KEY)
+        command = kwargs["command"]
+
+        for hook in self.hooks["pre_request"]:
+            hook(command, kwargs)
+
+        info = None
+        if self.hooks["post_request"]:
+            info = RequestInfo(command, kwargs)
+
+        waited = 0.0
+        if self.rate_limiter is not None:
+            waited = self.rate_limiter.acquire(command)
+            if info is not None:
+                info.wait_time = waited
+
+        profiler = self.profiler
+        started = time.time()
+        try:
+            if profiler is None:
+                text = self.transport.send(self.API_URL, payload, self.timeout)
+            else:
+                text, server_time = self.transport.send_timed(self.API_URL,
+                    payload, self.timeout)
+        except Exception as exc:
+            if info is not None:
+                info.elapsed = time.time() - started
+                info.error = exc
+                self._post_request(info)
+            raise
+
+        if info is None and profiler is None:
+            response = self._check_response_status(text)
+        else:
+            checked = time.time()
+            response = self._check_response_status(text)
+            check_time = time.time() - checked
+            if info is not None:
+                info.elapsed = checked - started
+                info.chars = len(text)
+                info.check_time = check_time
+            if profiler is not None:
+                profiler.record_request(command, waited, server_time,
+                    checked - started - server_time, check_time)
+
+        if self.rate_limiter is not None or info is not None:
+            results = self._result_codes(command, response)
+            if self.rate_limiter is not None:
+                self.rate_limiter.update(command, results)
+            if info is not None:
+                info.results = results
+                self._post_request(info)
+        return response
@@ -0,0 +1,144 @@
+"""
+Request coalescing for clients shared by many threads.
+"""
+import threading
+
+
+class _Call(object):
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Runs one call per key at a time. Threads asking for a key that is
+    already in flight wait for that call and share its result or exception.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """Return ``func()``, or the result of the call already running."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        """Return a `dict` of calls made and calls that shared one."""
+        return {"calls": self.calls, "shared": self.shared}
+
+
+class _Batch(object):
+    __slots__ = ("domains", "full", "done", "results", "error")
+
+    def __init__(self):
+        self.domains = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+
+class SearchBatcher(object):
+    """
+    Merges concurrent single-domain searches into one multi-domain search.
+
+    The first caller opens a batch and waits up to ``window`` seconds for
+    others to join, or until the batch holds ``max_size`` domains, then
+    sends it. Every caller receives its own domain's result.
+    """
+
+    def __init__(self, send, window=0.005, max_size=100):
+        """
+        :param send: Callable taking a `list` of domains and returning the
+            search results or an error dict.
+        :param window: Seconds to wait for more domains.
+        :param max_size: Most domains merged into one search.
+        """
+        self.send = send
+        self.window = window
+        self.max_size = max_size
+        self.batches = 0
+        self.merged = 0
+        self._batch = None
+        self._lock = threading.Lock()
+
+    def search(self, domain):
+        """Search one domain. Returns what ``Dynadot.search`` would."""
+        with self._lock:
+            batch = self._batch
+            leader = batch is None
+            if leader:
+                batch = self._batch = _Batch()
+                self.batches += 1
+            else:
+                self.merged += 1
+
+            try:
+                index = batch.domains.index(domain)
+            except ValueError:
+                index = len(batch.domains)
+                batch.domains.append(domain)
+            if len(batch.domains) >= self.max_size:
+                self._batch = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._batch is batch:
+                    self._batch = None
+            try:
+                batch.results = self.send(batch.domains)
+            except Exception as exc:
+                batch.error = exc
+            batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        if isinstance(batch.results, dict):
+            return batch.results
+
+        param = "domain%d" % index
+        for result in batch.results:
+            if result.domain_param == param:
+                result = result.copy()
+                result.domain_param = "domain0"
+                return [result]
+        return []
+
+    def stats(self):
+        """Return a `dict` of searches sent and domains merged into them."""
+        return {"batches": self.batches, "merged": self.merged}
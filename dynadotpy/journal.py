@@ -0,0 +1,184 @@
+"""
+Write-ahead journal of mutating commands, so an interrupted job can be
+resumed without sending everything again.
+"""
+import json
+import os
+import threading
+import time
+
+
+class Journal(object):
+    """
+    Append-only log of the commands a :class:`dynadotpy.client.Dynadot`
+    sends that change your account. Each command gets a ``begin`` record
+    before it is sent and an ``end`` record with its result codes after.
+    A command whose request raised, or that has no ``end`` record because
+    the process died, is *incomplete*: Dynadot may or may not have
+    processed it. :meth:`dynadotpy.client.Dynadot.resume_journal` replays
+    those.
+
+    With ``durable`` set, a ``begin`` record is on disk before its request
+    goes out. Threads writing at the same time share one ``fsync``, so
+    throughput grows with concurrency. Without it the file is synced at
+    most every ``sync_interval`` seconds, which is faster but can lose the
+    last records in a power failure.
+
+    The API key is never written.
+    """
+    COMMANDS = ("delete", "register", "renew", "set_folder", "set_ns",
+        "set_renew_option")
+
+    def __init__(self, path, durable=True, sync_interval=1.0,
+                 commands=COMMANDS):
+        """
+        :param path: Journal file, created if missing. An existing journal
+            is read to find its incomplete commands.
+        :param durable: Sync each ``begin`` record before sending.
+        :param sync_interval: Seconds between syncs when not ``durable``.
+        :param commands: API commands to journal.
+        """
+        self.path = path
+        self.durable = durable
+        self.sync_interval = sync_interval
+        self.commands = frozenset(commands)
+        self._pending = {}
+        self._last_id = 0
+        self._written = 0
+        self._synced = 0
+        self._last_sync = time.time()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+        if os.path.exists(path):
+            self._load()
+        self._fp = open(path, "a")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def begin(self, command, params):
+        """
+        Record a command about to be sent.
+
+        :return: Its id, for :meth:`end`.
+        """
+        with self._lock:
+            self._last_id += 1
+            entry = self._last_id
+            record = {"op": "begin", "id": entry, "command": command,
+                "params": params, "time": time.time()}
+            self._pending[entry] = record
+            self._write(record)
+            written = self._written
+        if self.durable:
+            self._sync(written)
+        else:
+            self._maybe_sync()
+        return entry
+
+    def end(self, entry, results=None, error=None):
+        """
+        Record the outcome of a command.
+
+        :param entry: Id returned by :meth:`begin`.
+        :param results: Result codes of the response.
+        :param error: The exception the request raised. The command stays
+            incomplete.
+        """
+        record = {"op": "end", "id": entry, "time": time.time()}
+        if error is not None:
+            record["error"] = "%s: %s" % (error.__class__.__name__, error)
+        else:
+            record["results"] = list(results)
+        with self._lock:
+            if error is None:
+                self._pending.pop(entry, None)
+            self._write(record)
+        self._maybe_sync()
+
+    def incomplete(self):
+        """
+        Return the ``begin`` records of commands without an outcome, in
+        the order they were sent. Each is a `dict` with ``id``,
+        ``command``, ``params`` and ``time``.
+        """
+        with self._lock:
+            return [self._pending[entry] for entry in sorted(self._pending)]
+
+    def sync(self):
+        """Write everything recorded so far to disk."""
+        with self._lock:
+            written = self._written
+        self._sync(written)
+
+    def compact(self):
+        """Rewrite the journal keeping only incomplete commands."""
+        with self._lock:
+            self._fp.flush()
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as fp:
+                for entry in sorted(self._pending):
+                    fp.write(json.dumps(self._pending[entry],
+                        sort_keys=True) + "\n")
+                fp.flush()
+                os.fsync(fp.fileno())
+            self._fp.close()
+            getattr(os, "replace", os.rename)(tmp, self.path)
+            self._fp = open(self.path, "a")
+            self._synced = self._written
+
+    def close(self):
+        """Sync and close the journal file."""
+        self.sync()
+        with self._lock:
+            self._fp.close()
+
+    def _load(self):
+        complete = 0
+        torn = False
+        with open(self.path, "rb") as fp:
+            for line in fp:
+                if not line.endswith(b"\n"):
+                    torn = True
+                    break
+                complete += len(line)
+                try:
+                    record = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    continue
+                entry = record["id"]
+                self._last_id = max(self._last_id, entry)
+                if record["op"] == "begin":
+                    self._pending[entry] = record
+                elif "error" not in record:
+                    self._pending.pop(entry, None)
+
+        if torn:
+            # A torn last line from a crash mid-write. Cut it off so the
+            # next record is not appended to it.
+            with open(self.path, "r+b") as fp:
+                fp.truncate(complete)
+
+    def _write(self, record):
+        self._fp.write(json.dumps(record, sort_keys=True) + "\n")
+        self._fp.flush()
+        self._written += 1
+
+    def _maybe_sync(self):
+        if time.time() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def _sync(self, written):
+        with self._sync_lock:
+            if self._synced >= written:
+                return
+            with self._lock:
+                target = self._written
+                fileno = self._fp.fileno()
+            os.fsync(fileno)
+            self._synced = target
+            self._last_sync = time.time()
@@ -0,0 +1,103 @@
+"""
+In-process request metrics for :class:`dynadotpy.client.Dynadot`.
+"""
+import bisect
+import threading
+
+from dynadotpy.client import COMMAND_RESPONSES
+
+
+class MetricsCollector(object):
+    """
+    Collects per-command request counts, latency histograms, byte counts
+    and result code distributions. It is a ``post_request`` hook:
+
+    ::
+        >>> metrics = MetricsCollector()
+        >>> metrics.install(dyn)
+        >>> dyn.search(["example.com"])
+        >>> metrics.snapshot()["search"]["requests"]
+        1
+    """
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+        10.0, float("inf"))
+
+    def __init__(self, buckets=None):
+        """
+        :param buckets: Ascending upper bounds in seconds for the latency
+            histogram. The last one should be ``float("inf")``.
+        """
+        self.buckets = tuple(buckets or self.BUCKETS)
+        self._commands = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, info):
+        bucket = bisect.bisect_left(self.buckets, info.elapsed)
+        with self._lock:
+            stats = self._commands.get(info.command)
+            if stats is None:
+                stats = self._commands[info.command] = self._new_stats(
+                    info.command)
+
+            stats["requests"] += 1
+            stats["latency_sum"] += info.elapsed
+            stats["latency_buckets"][bucket] += 1
+            stats["wait_time"] += info.wait_time
+            stats["check_time"] += info.check_time
+            stats["chars"] += info.chars
+            if info.error is not None:
+                stats["exceptions"] += 1
+            results = stats["results"]
+            for result in info.results:
+                results[result] = results.get(result, 0) + 1
+
+    def install(self, client):
+        """Start collecting metrics for ``client``."""
+        client.add_hook("post_request", self)
+
+    def uninstall(self, client):
+        """Stop collecting metrics for ``client``."""
+        client.remove_hook("post_request", self)
+
+    def reset(self):
+        """Forget everything collected so far."""
+        with self._lock:
+            self._commands = {}
+
+    def snapshot(self):
+        """
+        Return a `dict` of command to its metrics:
+
+        * ``requests`` - Requests sent, retries included.
+        * ``exceptions`` - Requests that raised instead of returning.
+        * ``latency_sum`` - Total seconds spent on the network.
+        * ``latency_buckets`` - List of ``(upper_bound, count)`` pairs,
+          not cumulative.
+        * ``wait_time`` - Seconds spent waiting on the rate limiter.
+        * ``check_time`` - Seconds spent splitting response bodies.
+        * ``chars`` - Characters of the response bodies, after the
+          transport decoded them.
+        * ``results`` - Count per result code. Every code in the command's
+          response table is present, plus any unexpected ones.
+        """
+        with self._lock:
+            snapshot = {}
+            for command, stats in self._commands.items():
+                stats = dict(stats)
+                stats["latency_buckets"] = list(zip(self.buckets,
+                    stats["latency_buckets"]))
+                stats["results"] = dict(stats["results"])
+                snapshot[command] = stats
+            return snapshot
+
+    def _new_stats(self, command):
+        return {
+            "requests": 0,
+            "exceptions": 0,
+            "latency_sum": 0.0,
+            "latency_buckets": [0] * len(self.buckets),
+            "wait_time": 0.0,
+            "check_time": 0.0,
+            "chars": 0,
+            "results": dict.fromkeys(COMMAND_RESPONSES.get(command, ()), 0),
+        }
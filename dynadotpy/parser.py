@@ -0,0 +1,48 @@
+"""
+Incremental parsing of api2.html responses.
+
+These functions read a response as an iterable of text chunks, such as
+``requests.Response.iter_content(decode_unicode=True)``, and yield results
+as soon as their line has arrived. Only one chunk is split at a time, so
+memory does not grow with the size of the response. They produce the same
+values as the ``_parse_*`` methods on :class:`dynadotpy.client.Dynadot`.
+"""
+from dynadotpy.client import STATUS_CODES
+from dynadotpy.results import SearchResult
+
+
+def iter_lines(chunks):
+    """
+    Yield newline-terminated lines from an iterable of text chunks. Text
+    after the last newline is dropped, like ``_check_response_status``.
+    """
+    pending = ""
+    for chunk in chunks:
+        if pending:
+            chunk = pending + chunk
+        lines = chunk.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line
+
+
+def read_status(lines):
+    """
+    Consume the status header from an iterator of lines.
+
+    :return: `list` of status fields. Contains ``"error"`` if the request
+        failed, in which case no result lines follow.
+    """
+    status = next(lines, "").split(",")
+    if "error" not in status:
+        next(lines, None)
+    return status
+
+
+def iter_search_records(lines):
+    """Yield a :class:`dynadotpy.results.SearchResult` for each line."""
+    status = STATUS_CODES.get
+    for line in lines:
+        fields = line.split(",")
+        yield SearchResult(fields[0], fields[1], fields[2],
+            status(fields[3], fields[3]), fields[4])
@@ -0,0 +1,173 @@
+"""
+Per-stage timing of :class:`dynadotpy.client.Dynadot` commands.
+"""
+import cProfile
+import pstats
+import sys
+import threading
+from contextlib import contextmanager
+
+
+class Profiler(object):
+    """
+    Splits the time of every request into stages and totals them per
+    command:
+
+    * ``wait`` - Waiting on the rate limiter.
+    * ``server`` - From sending the request until the response headers
+      arrived, connecting included.
+    * ``download`` - Reading the response body.
+    * ``check`` - Splitting the body into lines.
+    * ``parse`` - Building result objects, once per command.
+
+    It costs a few clock reads and one lock per request, so it can stay
+    on against live traffic for a while. ``iter_search`` is not timed.
+
+    ::
+        >>> profiler = Profiler()
+        >>> profiler.install(dyn)
+        >>> dyn.search(["example.com"])
+        >>> print(profiler.report())
+    """
+    STAGES = ("wait", "server", "download", "check", "parse")
+
+    def __init__(self):
+        self._commands = {}
+        self._lock = threading.Lock()
+        self._profiles = []
+
+    def install(self, client):
+        """Start timing ``client``'s requests."""
+        client.profiler = self
+
+    def uninstall(self, client):
+        """Stop timing ``client``'s requests."""
+        client.profiler = None
+
+    def record_request(self, command, wait, server, download, check):
+        """Add the stage timings of one request."""
+        with self._lock:
+            stats = self._stats(command)
+            stats["requests"] += 1
+            for stage, seconds in (("wait", wait), ("server", server),
+                    ("download", download), ("check", check)):
+                totals = stats[stage]
+                totals[0] += seconds
+                if seconds > totals[1]:
+                    totals[1] = seconds
+
+    def record_parse(self, command, seconds):
+        """Add the time spent parsing one command's response."""
+        with self._lock:
+            stats = self._stats(command)
+            stats["parses"] += 1
+            totals = stats["parse"]
+            totals[0] += seconds
+            if seconds > totals[1]:
+                totals[1] = seconds
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._commands = {}
+
+    def snapshot(self):
+        """
+        Return a `dict` of command to its ``requests`` and ``parses``
+        counts, and for each stage a `dict` with the ``total`` and ``max``
+        seconds.
+        """
+        with self._lock:
+            snapshot = {}
+            for command, stats in self._commands.items():
+                snapshot[command] = {"requests": stats["requests"],
+                    "parses": stats["parses"]}
+                for stage in self.STAGES:
+                    total, longest = stats[stage]
+                    snapshot[command][stage] = {"total": total, "max": longest}
+            return snapshot
+
+    def report(self):
+        """Return a text table of the stage timings per command."""
+        lines = ["%-18s %-9s %8s %10s %10s %10s %6s" % ("command", "stage",
+            "count", "total ms", "mean ms", "max ms", "share")]
+        for command, stats in sorted(self.snapshot().items()):
+            overall = sum(stats[stage]["total"] for stage in self.STAGES)
+            for stage in self.STAGES:
+                count = stats["parses" if stage == "parse" else "requests"]
+                total = stats[stage]["total"]
+                lines.append("%-18s %-9s %8d %10.2f %10.3f %10.3f %5.1f%%" % (
+                    command, stage, count, total * 1000,
+                    total * 1000 / count if count else 0.0,
+                    stats[stage]["max"] * 1000,
+                    total * 100 / overall if overall else 0.0))
+        return "\n".join(lines)
+
+    def write_folded(self, fp):
+        """
+        Write the stage totals as folded stacks, one
+        ``dynadotpy;command;stage microseconds`` line each, for
+        ``flamegraph.pl`` or speedscope.
+
+        :param fp: File object or path.
+        """
+        if not hasattr(fp, "write"):
+            with open(fp, "w") as out:
+                return self.write_folded(out)
+
+        for command, stats in sorted(self.snapshot().items()):
+            for stage in self.STAGES:
+                micros = int(stats[stage]["total"] * 1000000)
+                if micros:
+                    fp.write("dynadotpy;%s;%s %d\n" % (command, stage, micros))
+
+    @contextmanager
+    def profile(self):
+        """
+        Run cProfile on the current thread and on threads started inside
+        the block, such as the workers of ``batch`` or ``bulk_search``.
+        Write the result with :meth:`dump_stats`.
+        """
+        profiles = []
+
+        def start_thread(*args):
+            sys.setprofile(None)
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler is already active in this thread.
+                return
+            profiles.append(profile)
+
+        main = cProfile.Profile()
+        profiles.append(main)
+        threading.setprofile(start_thread)
+        main.enable()
+        try:
+            yield
+        finally:
+            main.disable()
+            threading.setprofile(None)
+            self._profiles = profiles
+
+    def stats(self):
+        """Return :class:`pstats.Stats` of the last :meth:`profile` block."""
+        if not self._profiles:
+            raise ValueError("Nothing was profiled yet.")
+        return pstats.Stats(*self._profiles)
+
+    def dump_stats(self, path):
+        """
+        Save the last :meth:`profile` block in cProfile format, for
+        ``pstats``, snakeviz or ``flameprof``.
+        """
+        self.stats().dump_stats(path)
+
+    def _stats(self, command):
+        stats = self._commands.get(command)
+        if stats is None:
+            stats = self._commands[command] = {"requests": 0, "parses": 0}
+            for stage in self.STAGES:
+                stats[stage] = [0.0, 0.0]
+        return stats
@@ -0,0 +1,143 @@
+"""
+Client-side rate limiting for Dynadot commands.
+"""
+import threading
+import time
+
+
+class TokenBucket(object):
+    """
+    Thread-safe token bucket. Callers that find the bucket empty reserve
+    their token and sleep until it is refilled, so waiting callers are
+    served in arrival order.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        :param rate: Tokens added per second.
+        :param capacity: Maximum burst size. Defaults to one second of tokens.
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping if needed. Returns seconds waited."""
+        with self._lock:
+            now = time.time()
+            self._tokens = min(self.capacity,
+                self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def set_rate(self, rate):
+        """Change the refill rate, keeping the tokens already earned."""
+        with self._lock:
+            now = time.time()
+            self._tokens = min(self.capacity,
+                self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.rate = float(rate)
+
+
+class RateLimiter(object):
+    """
+    Token-bucket limiter for :class:`dynadotpy.client.Dynadot`. One limiter
+    can be shared by any number of clients and threads.
+
+    In adaptive mode every ``system_busy`` or ``over_quota`` result cuts the
+    command's rate by ``backoff_factor``, down to ``min_rate``. Each clean
+    response then adds back ``recovery_step`` of the configured rate until
+    it is reached again.
+    """
+    THROTTLE_RESULTS = ("system_busy", "over_quota")
+
+    def __init__(self, rate=10, burst=None, per_command=None, adaptive=False,
+                 min_rate=0.5, backoff_factor=0.5, recovery_step=0.05):
+        """
+        :param rate: Requests per second shared by commands without their
+            own limit.
+        :param burst: Maximum burst size. Defaults to one second of requests.
+        :param per_command: `dict` of API command (e.g. ``"search"``) to its
+            own requests per second.
+        :param adaptive: Back off automatically on throttling results.
+        :param min_rate: Lowest rate adaptive mode will back off to.
+        :param backoff_factor: Multiplier applied to the rate on throttling.
+        :param recovery_step: Fraction of the configured rate restored per
+            clean response.
+        """
+        self.adaptive = adaptive
+        self.min_rate = min_rate
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step
+
+        self._default = TokenBucket(rate, burst)
+        self._buckets = {command: TokenBucket(command_rate, burst)
+            for command, command_rate in (per_command or {}).items()}
+        self._base_rates = {command: bucket.rate
+            for command, bucket in self._buckets.items()}
+        self._base_rates[None] = self._default.rate
+
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, command):
+        """Wait for a token for ``command``. Returns seconds waited."""
+        waited = self._bucket(command).acquire()
+
+        with self._lock:
+            stats = self._command_stats(command)
+            stats["calls"] += 1
+            if waited:
+                stats["waits"] += 1
+                stats["wait_time"] += waited
+        return waited
+
+    def update(self, command, results):
+        """Adapt the rate for ``command`` to the result codes it got back."""
+        throttled = any(result in self.THROTTLE_RESULTS for result in results)
+        if throttled:
+            with self._lock:
+                self._command_stats(command)["throttled"] += 1
+
+        if not self.adaptive:
+            return
+
+        bucket = self._bucket(command)
+        base = self._base_rates[command if command in self._buckets else None]
+        if throttled:
+            bucket.set_rate(max(self.min_rate, bucket.rate * self.backoff_factor))
+        elif bucket.rate < base:
+            bucket.set_rate(min(base, bucket.rate + base * self.recovery_step))
+
+    def stats(self):
+        """
+        Return a `dict` of per-command call, wait and throttle counts,
+        total seconds spent waiting, and the current rates.
+        """
+        with self._lock:
+            commands = {command: dict(stats)
+                for command, stats in self._stats.items()}
+
+        rates = {command: bucket.rate
+            for command, bucket in self._buckets.items()}
+        rates["default"] = self._default.rate
+        return {
+            "commands": commands,
+            "wait_time": sum(stats["wait_time"] for stats in commands.values()),
+            "rates": rates,
+        }
+
+    def _bucket(self, command):
+        return self._buckets.get(command, self._default)
+
+    def _command_stats(self, command):
+        return self._stats.setdefault(command,
+            {"calls": 0, "waits": 0, "wait_time": 0.0, "throttled": 0})
@@ -0,0 +1,192 @@
+"""
+Bring the nameservers of many domains to a desired state, changing only
+the domains that drifted.
+"""
+import time
+
+from dynadotpy.batch import BatchExecutor
+from dynadotpy.validation import normalize_domain, normalize_nameservers
+
+MAX_NAMESERVERS = 13
+
+
+class PlanEntry(object):
+    """
+    What the reconciler will do for one domain. ``action`` is ``"noop"``
+    when the nameservers already match, ``"update"`` when they differ and
+    ``"error"`` when the domain could not be checked. ``current`` and
+    ``desired`` are tuples of normalized nameservers.
+    """
+    __slots__ = ("domain", "action", "current", "desired", "message")
+
+    def __init__(self, domain, action, current=(), desired=(), message=None):
+        self.domain = domain
+        self.action = action
+        self.current = current
+        self.desired = desired
+        self.message = message
+
+    def __repr__(self):
+        return "<PlanEntry %s %s>" % (self.domain, self.action)
+
+    @property
+    def added(self):
+        """Nameservers to add, in desired order."""
+        return [ns for ns in self.desired if ns not in self.current]
+
+    @property
+    def removed(self):
+        """Nameservers to remove."""
+        return [ns for ns in self.current if ns not in self.desired]
+
+
+class ReconcileReport(object):
+    """
+    Plan of a reconciliation and, unless it was a dry run, the
+    :class:`dynadotpy.batch.BatchReport` of the ``set_nameservers`` calls
+    it made.
+    """
+
+    def __init__(self, plan, updates, elapsed):
+        self.plan = plan
+        self.updates = updates
+        self.elapsed = elapsed
+        self.actions = {}
+        for entry in plan:
+            self.actions[entry.action] = self.actions.get(entry.action, 0) + 1
+
+    @property
+    def dry_run(self):
+        return self.updates is None
+
+    @property
+    def failed(self):
+        """Plan errors and updates that did not succeed."""
+        failed = [entry for entry in self.plan if entry.action == "error"]
+        if self.updates is not None:
+            failed.extend(self.updates.failed)
+        return failed
+
+
+class NameserverReconciler(object):
+    """
+    Reads the nameservers of every domain in a desired-state mapping on
+    ``max_workers`` threads, compares them locally and calls
+    ``set_nameservers`` only for the domains that differ. Domains already
+    in the desired state cost one ``get_ns`` instead of two calls.
+
+    Names are compared lowercased and without a trailing dot, and order is
+    ignored, the same way the client compares cached nameservers.
+
+    ::
+        >>> reconciler = NameserverReconciler(dyn, max_workers=8)
+        >>> report = reconciler.reconcile({
+        ...     "example.com": ["ns1.example.net", "ns2.example.net"],
+        ...     "example.org": ["ns1.example.net", "ns2.example.net"],
+        ... }, dry_run=True)
+        >>> report.actions
+        {'noop': 1, 'update': 1}
+    """
+
+    def __init__(self, client, max_workers=8, fresh=True):
+        """
+        :param client: :class:`dynadotpy.client.Dynadot` to use. Its
+            ``pool_maxsize`` should be at least ``max_workers``.
+        :param max_workers: Requests sent at the same time.
+        :param fresh: Drop the client's cached nameservers before reading,
+            so drift made outside this client is seen.
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.fresh = fresh
+
+    def plan(self, desired, progress=None):
+        """
+        Read the current nameservers and work out what to change.
+
+        :param desired: `dict` of domain to a `list` of up to 13
+            nameservers.
+        :param progress: Optional callable receiving each ``get_ns``
+            :class:`dynadotpy.batch.OperationResult` as it finishes.
+        :return: `list` of :class:`PlanEntry`, in the order of ``desired``.
+        """
+        plan = []
+        reads = []
+        for domain, nameservers in desired.items():
+            entry = self._entry(domain, nameservers)
+            if entry.action is None:
+                reads.append(("get_nameservers", {"domain": entry.domain}))
+            plan.append(entry)
+
+        if self.fresh and self.client.cache is not None:
+            for _, kwargs in reads:
+                self.client.cache.invalidate(kwargs["domain"])
+
+        executor = BatchExecutor(self.client, self.max_workers)
+        current = {}
+        for result in executor.run(reads):
+            current[result.kwargs["domain"]] = result
+            if progress is not None:
+                progress(result)
+
+        for entry in plan:
+            if entry.action is None:
+                self._compare(entry, current[entry.domain])
+        return plan
+
+    def apply(self, plan, progress=None):
+        """
+        Set the nameservers of every ``"update"`` entry of a plan.
+
+        :param progress: Optional callable receiving each ``set_ns``
+            :class:`dynadotpy.batch.OperationResult` as it finishes.
+        :return: :class:`dynadotpy.batch.BatchReport` of the updates.
+        """
+        executor = BatchExecutor(self.client, self.max_workers)
+        return executor.execute([("set_nameservers", {"domain": entry.domain,
+            "nameservers": list(entry.desired)}) for entry in plan
+            if entry.action == "update"], progress)
+
+    def reconcile(self, desired, dry_run=False, progress=None):
+        """
+        :meth:`plan` and, unless ``dry_run`` is set, :meth:`apply`.
+
+        :return: :class:`ReconcileReport`.
+        """
+        started = time.time()
+        plan = self.plan(desired, progress)
+        updates = None if dry_run else self.apply(plan, progress)
+        return ReconcileReport(plan, updates, time.time() - started)
+
+    def _entry(self, domain, nameservers):
+        try:
+            domain = normalize_domain(domain, self.client.tlds)
+        except ValueError as exc:
+            return PlanEntry(domain, "error", message=str(exc))
+
+        if not isinstance(nameservers, (list, tuple)) or not nameservers:
+            return PlanEntry(domain, "error",
+                message="Nameservers must be a non-empty list")
+        try:
+            nameservers = normalize_nameservers(list(nameservers))
+        except ValueError as exc:
+            return PlanEntry(domain, "error", message=str(exc))
+        if len(nameservers) > MAX_NAMESERVERS:
+            return PlanEntry(domain, "error", desired=tuple(nameservers),
+                message="Too many name servers. Dynadot only allows up to "
+                    "13 name servers.")
+        return PlanEntry(domain, None, desired=tuple(nameservers))
+
+    def _compare(self, entry, read):
+        if not read.success:
+            entry.action = "error"
+            entry.message = read.message or read.status
+            return
+
+        nameservers = (read.result["ns%d" % num] for num in range(13))
+        entry.current = tuple(ns.lower().rstrip(".")
+            for ns in nameservers if ns)
+        if set(entry.current) == set(entry.desired):
+            entry.action = "noop"
+        else:
+            entry.action = "update"
@@ -0,0 +1,209 @@
+"""
+Plan and run domain renewals by expiration date.
+"""
+import heapq
+import threading
+import time
+from datetime import datetime
+
+from dynadotpy.batch import BatchExecutor, BatchReport, OperationResult
+from dynadotpy.results import parse_expiration
+
+DAY_MS = 24 * 60 * 60 * 1000
+EPOCH = datetime(1970, 1, 1)
+
+
+def _to_ms(expiration):
+    """Return an expiration `datetime` or epoch-millis value as an `int`."""
+    if isinstance(expiration, datetime):
+        delta = expiration - EPOCH
+        return (delta.days * 86400 + delta.seconds) * 1000 + (
+            delta.microseconds // 1000)
+    return int(expiration)
+
+
+class RenewalPlanner(object):
+    """
+    Keeps domains in a heap ordered by expiration, so the next ones to
+    expire are found without scanning the whole account, and renews them
+    in parallel batches.
+
+    Renewals go through the client, so they share its rate limiter, retry
+    policy and domain store. Before each batch the planner asks ``funds``
+    for the account balance and only sends as many renewals as it covers.
+    If Dynadot still answers ``insufficient_funds``, the rest of the batch
+    and all later batches are skipped instead of being sent one by one.
+
+    ::
+        >>> planner = RenewalPlanner.from_store(store, dyn,
+        ...     funds=lambda: 120.0, price=9.99)
+        >>> planner.due(within_days=30)
+        [('example.com', datetime.datetime(2024, 5, 1, 12, 0))]
+        >>> report = planner.renew_due(within_days=30)
+        >>> report.statuses
+        {'success': 1}
+    """
+
+    def __init__(self, client, duration=1, max_workers=4, batch_size=20,
+                 funds=None, price=None):
+        """
+        :param client: :class:`dynadotpy.client.Dynadot` to renew with.
+        :param duration: Years to renew each domain for.
+        :param max_workers: Renewals sent at the same time.
+        :param batch_size: Renewals per batch. Funds are checked before
+            each batch.
+        :param funds: Optional callable returning the account balance.
+        :param price: Price of renewing one domain for one year, in the
+            currency of ``funds``. Required with ``funds``.
+        """
+        if funds is not None and not price:
+            raise ValueError("A price is required to check funds.")
+
+        self.client = client
+        self.duration = duration
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.funds = funds
+        self.price = price
+        self._heap = []
+        self._expirations = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_store(cls, store, client, **kwargs):
+        """
+        Build a planner from the expiration dates in a
+        :class:`dynadotpy.store.DomainStore`.
+        """
+        planner = cls(client, **kwargs)
+        for domain, expiration in store.expirations():
+            planner.add(domain, expiration)
+        return planner
+
+    def __len__(self):
+        return len(self._expirations)
+
+    def add(self, domain, expiration):
+        """
+        Track a domain, or update its expiration.
+
+        :param domain: Domain name.
+        :param expiration: `datetime` in UTC, or epoch milliseconds as an
+            `int` or string like ``expiration_date`` in results.
+        """
+        expiration = _to_ms(expiration)
+        domain = domain.lower()
+        with self._lock:
+            if self._expirations.get(domain) == expiration:
+                return
+            self._expirations[domain] = expiration
+            heapq.heappush(self._heap, (expiration, domain))
+            if len(self._heap) > 2 * len(self._expirations) + 64:
+                self._compact()
+
+    def remove(self, domain):
+        """Stop tracking a domain."""
+        with self._lock:
+            self._expirations.pop(domain.lower(), None)
+
+    def expiration(self, domain):
+        """Return the expiration `datetime` of a tracked domain, or None."""
+        return parse_expiration(self._expirations.get(domain.lower()))
+
+    def due(self, within_days, now=None):
+        """
+        Return ``(domain, expires)`` pairs of domains expiring within
+        ``within_days``, already expired ones included, soonest first.
+
+        Only the part of the heap at or before the cutoff is visited.
+
+        :param now: Epoch seconds to count from. Defaults to now.
+        """
+        if now is None:
+            now = time.time()
+        cutoff = int(now * 1000) + int(within_days * DAY_MS)
+
+        with self._lock:
+            heap = self._heap
+            found = []
+            seen = set()
+            pending = [0]
+            while pending:
+                num = pending.pop()
+                if num >= len(heap) or heap[num][0] > cutoff:
+                    continue
+                expiration, domain = heap[num]
+                # Re-adding a domain at an old expiration leaves two
+                # identical live entries in the heap.
+                if (self._expirations.get(domain) == expiration
+                        and domain not in seen):
+                    seen.add(domain)
+                    found.append(heap[num])
+                pending.extend((2 * num + 1, 2 * num + 2))
+
+        found.sort()
+        return [(domain, parse_expiration(expiration))
+            for expiration, domain in found]
+
+    def renew_due(self, within_days, progress=None, now=None):
+        """
+        Renew every domain :meth:`due` within ``within_days``.
+
+        Successful renewals move the domain to its new expiration date.
+
+        :param progress: Optional callable receiving each
+            :class:`dynadotpy.batch.OperationResult` as it finishes.
+        :return: :class:`dynadotpy.batch.BatchReport` in :meth:`due` order.
+            Domains that were not sent have status ``"skipped"``.
+        """
+        started = time.time()
+        plan = [domain for domain, _ in self.due(within_days, now)]
+        executor = BatchExecutor(self.client, self.max_workers)
+        results = []
+        stopped = None
+
+        for start in range(0, len(plan), self.batch_size):
+            batch = plan[start:start + self.batch_size]
+            if stopped is not None:
+                results.extend(self._skipped(start, batch, stopped))
+                continue
+            if self.funds is not None:
+                affordable = max(0, int(
+                    self.funds() // (self.price * self.duration)))
+                if affordable < len(batch):
+                    stopped = "Not enough funds for this renewal"
+                    results.extend(self._skipped(start + affordable,
+                        batch[affordable:], stopped))
+                    batch = batch[:affordable]
+                    if not batch:
+                        continue
+
+            report = executor.execute([("renew", {"domain": domain,
+                "duration": self.duration}) for domain in batch], progress,
+                stop_on=("insufficient_funds",))
+            for result in report.results:
+                result.index += start
+                if result.success:
+                    self.add(result.kwargs["domain"],
+                        result.result["expiration_date"])
+            results.extend(report.results)
+            if "insufficient_funds" in report.statuses:
+                stopped = "Renewals stopped after insufficient_funds"
+
+        results.sort(key=lambda result: result.index)
+        return BatchReport(results, time.time() - started)
+
+    def _skipped(self, start, domains, message):
+        skipped = []
+        for num, domain in enumerate(domains):
+            result = OperationResult(start + num, "renew",
+                {"domain": domain, "duration": self.duration})
+            result.status = "skipped"
+            result.message = message
+            skipped.append(result)
+        return skipped
+
+    def _compact(self):
+        self._heap = [(expiration, domain)
+            for domain, expiration in self._expirations.items()]
+        heapq.heapify(self._heap)
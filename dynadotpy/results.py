@@ -0,0 +1,125 @@
+"""
+Compact result objects returned by :class:`dynadotpy.client.Dynadot`
+when it is created with ``compact_results=True``. By default commands
+return plain dicts as before.
+
+Each class stores its fields in ``__slots__`` and is also a read-only
+mapping with the same keys as those dicts, so ``result["result"]``,
+``result.get("more_info")`` and ``dict(result)`` work with either.
+"""
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+
+
+def parse_expiration(value):
+    """
+    Return the naive UTC `datetime` of an expiration date in epoch
+    milliseconds, as the API sends it, or None if it is blank.
+    """
+    from datetime import datetime, timedelta
+
+    if value in (None, ""):
+        return None
+    return datetime(1970, 1, 1) + timedelta(milliseconds=int(value))
+
+
+class BaseResult(Mapping):
+    """Slotted result with a read-only `dict` view of its fields."""
+    __slots__ = ()
+    KEYS = ()
+
+    def __getitem__(self, key):
+        if key not in self.keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __repr__(self):
+        return "<%s %r>" % (self.__class__.__name__, self.as_dict())
+
+    def as_dict(self):
+        """Return the fields as a plain `dict`."""
+        return {key: self[key] for key in self.keys()}
+
+    def copy(self):
+        """Return a new result with the same fields."""
+        return self.__class__(*[getattr(self, slot) for slot in self.__slots__])
+
+    def keys(self):
+        return self.KEYS
+
+
+class Result(BaseResult):
+    """Result of ``delete``, ``set_folder``, ``set_ns`` and
+    ``set_renew_option``."""
+    __slots__ = ("result", "more_info")
+    KEYS = ("result", "more_info")
+
+    def __init__(self, result, more_info):
+        self.result = result
+        self.more_info = more_info
+
+
+class RegistrationResult(BaseResult):
+    """Result of ``register`` and ``renew``."""
+    __slots__ = ("result", "more_info", "expiration_date")
+    KEYS = ("result", "more_info", "expiration_date")
+
+    def __init__(self, result, more_info, expiration_date):
+        self.result = result
+        self.more_info = more_info
+        self.expiration_date = expiration_date
+
+    @property
+    def expires(self):
+        """``expiration_date`` as a naive UTC `datetime`, or None."""
+        return parse_expiration(self.expiration_date)
+
+
+class NameserversResult(BaseResult):
+    """
+    Result of ``get_ns``. ``nameservers`` is a tuple without the unused
+    slots at the end. The mapping view still has all thirteen
+    ``ns0``-``ns12`` keys on success, with blank strings for unused ones.
+    """
+    __slots__ = ("result", "more_info", "nameservers")
+    KEYS = ("result", "more_info")
+    NS_KEYS = tuple("ns%d" % num for num in range(13))
+    SUCCESS_KEYS = KEYS + NS_KEYS
+
+    def __init__(self, result, more_info, nameservers=()):
+        self.result = result
+        self.more_info = more_info
+        self.nameservers = nameservers
+
+    def __getitem__(self, key):
+        if key in self.NS_KEYS and self.result == "success":
+            num = int(key[2:])
+            return self.nameservers[num] if num < len(self.nameservers) else ""
+        return super(NameserversResult, self).__getitem__(key)
+
+    def keys(self):
+        if self.result == "success":
+            return self.SUCCESS_KEYS
+        return self.KEYS
+
+
+class SearchResult(BaseResult):
+    """One domain of a ``search`` response."""
+    __slots__ = ("domain_param", "domain", "language", "result", "info")
+    KEYS = ("domain_param", "domain", "language", "result", "info")
+
+    def __init__(self, domain_param, domain, language, result, info):
+        self.domain_param = domain_param
+        self.domain = domain
+        self.language = language
+        self.result = result
+        self.info = info
@@ -0,0 +1,153 @@
+"""
+Retry transient Dynadot failures with exponential backoff.
+"""
+import random
+import threading
+import time
+
+
+class RetryStats(object):
+    """Attempts made and seconds slept for a single command."""
+    __slots__ = ("command", "attempts", "backoff_time")
+
+    def __init__(self, command, attempts=0, backoff_time=0.0):
+        self.command = command
+        self.attempts = attempts
+        self.backoff_time = backoff_time
+
+    @property
+    def retries(self):
+        return max(0, self.attempts - 1)
+
+    def __repr__(self):
+        return "<RetryStats %s attempts=%d backoff_time=%.3f>" % (
+            self.command, self.attempts, self.backoff_time)
+
+
+class RetryPolicy(object):
+    """
+    Retry policy for :class:`dynadotpy.client.Dynadot`.
+
+    A response is retried when every result code in it is retryable, so a
+    search where only some domains came back ``offline`` is returned as is.
+
+    ``register`` and ``renew`` charge your account, so for them only
+    exceptions raised before the request reached Dynadot are retried.
+    Result codes such as ``system_busy`` are still retried, since Dynadot
+    did not process the order.
+    """
+    NON_IDEMPOTENT = ("register", "renew")
+
+    def __init__(self, max_attempts=3, backoff=0.5, max_backoff=30.0,
+                 jitter=True, deadline=None,
+                 retry_results=("offline", "system_busy"),
+                 retry_exceptions=None, safe_exceptions=None):
+        """
+        :param max_attempts: Total attempts per command, including the first.
+        :param backoff: Seconds to wait before the first retry. Doubles on
+            each following retry.
+        :param max_backoff: Upper bound for a single wait.
+        :param jitter: Randomize each wait between zero and its full value.
+        :param deadline: Seconds after which no further retry is started.
+        :param retry_results: Result codes that may be retried.
+        :param retry_exceptions: Exceptions that may be retried. Defaults
+            to ``requests.ConnectionError`` and ``requests.Timeout``.
+        :param safe_exceptions: Exceptions that may also be retried for
+            ``register`` and ``renew``. Defaults to
+            ``requests.ConnectTimeout``.
+        """
+        if retry_exceptions is None or safe_exceptions is None:
+            import requests
+            if retry_exceptions is None:
+                retry_exceptions = (requests.ConnectionError, requests.Timeout)
+            if safe_exceptions is None:
+                safe_exceptions = (requests.ConnectTimeout,)
+
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_results = frozenset(retry_results)
+        self.retry_exceptions = tuple(retry_exceptions)
+        self.safe_exceptions = tuple(safe_exceptions)
+
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def delay(self, attempt):
+        """Seconds to wait after failed attempt number ``attempt``."""
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def retryable_exception(self, command, exc):
+        if command in self.NON_IDEMPOTENT:
+            return isinstance(exc, self.safe_exceptions)
+        return isinstance(exc, self.retry_exceptions)
+
+    def retryable_results(self, command, results):
+        return bool(results) and all(
+            result in self.retry_results for result in results)
+
+    def run(self, command, send, result_codes, stats=None):
+        """
+        Call ``send()`` until it succeeds or the policy gives up.
+
+        :param command: API command name.
+        :param send: Callable returning a checked response.
+        :param result_codes: Callable of ``(command, response)`` returning
+            the result codes in the response.
+        :param stats: Optional :class:`RetryStats` to fill in, which is
+            also complete when the last attempt raised.
+        :return: Tuple of the last response and its :class:`RetryStats`.
+        """
+        if stats is None:
+            stats = RetryStats(command)
+        started = time.time()
+
+        while True:
+            stats.attempts += 1
+            error = None
+            try:
+                response = send()
+            except Exception as exc:
+                if not self.retryable_exception(command, exc):
+                    self._record(stats, gave_up=False)
+                    raise
+                error, response, retry = exc, None, True
+            else:
+                retry = self.retryable_results(command,
+                    result_codes(command, response))
+
+            delay = self.delay(stats.attempts)
+            out_of_time = (self.deadline is not None and
+                time.time() - started + delay > self.deadline)
+
+            if not retry or stats.attempts >= self.max_attempts or out_of_time:
+                self._record(stats, gave_up=retry)
+                if error is not None:
+                    raise error
+                return response, stats
+
+            time.sleep(delay)
+            stats.backoff_time += delay
+
+    def stats(self):
+        """
+        Return a `dict` of per-command calls, retries, seconds spent in
+        backoff and calls that were still failing when retries ran out.
+        """
+        with self._lock:
+            return {command: dict(totals)
+                for command, totals in self._totals.items()}
+
+    def _record(self, stats, gave_up):
+        with self._lock:
+            totals = self._totals.setdefault(stats.command, {"calls": 0,
+                "retries": 0, "backoff_time": 0.0, "gave_up": 0})
+            totals["calls"] += 1
+            totals["retries"] += stats.retries
+            totals["backoff_time"] += stats.backoff_time
+            totals["gave_up"] += int(gave_up)
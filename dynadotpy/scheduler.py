@@ -0,0 +1,196 @@
+"""
+Priority scheduling of commands that share one client.
+"""
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+from dynadotpy.client import Dynadot
+
+
+class DeadlineExceeded(Exception):
+    """A scheduled command was still queued when its deadline passed."""
+
+
+class Scheduler(object):
+    """
+    Runs client commands on worker threads, highest priority first.
+
+    Lower numbers run first. By default ``register`` and ``renew`` are
+    :attr:`URGENT`, other changes are :attr:`WRITE` and lookups are
+    :attr:`READ`. Within a priority, commands with the earliest deadline
+    run first, then commands without one in submission order. A command
+    still queued when its deadline passes fails with
+    :class:`DeadlineExceeded` without being sent.
+
+    The workers share the client's connections, rate limiter and retry
+    policy, so an urgent command waits for at most ``workers`` commands
+    that were already sent. Commands called on the client directly bypass
+    the queue.
+
+    ::
+        >>> scheduler = Scheduler(dyn, workers=8)
+        >>> sweep = [scheduler.submit("search", domains=chunk)
+        ...     for chunk in chunks]
+        >>> order = scheduler.submit("register", deadline=2.0,
+        ...     domain="example.com", duration=1)
+        >>> order.result()
+    """
+    URGENT = 0
+    WRITE = 1
+    READ = 2
+
+    PRIORITIES = {
+        "register": URGENT,
+        "renew": URGENT,
+        "delete": WRITE,
+        "set_folder": WRITE,
+        "set_nameservers": WRITE,
+        "set_renew_option": WRITE,
+        "get_nameservers": READ,
+        "search": READ,
+    }
+
+    def __init__(self, client, workers=4, priorities=None):
+        """
+        :param client: :class:`dynadotpy.client.Dynadot` to run commands on.
+        :param workers: Number of commands sent at the same time. Keep it
+            at or below the client's ``pool_maxsize``.
+        :param priorities: `dict` of method name to priority, overriding
+            :attr:`PRIORITIES`.
+        """
+        self.client = client
+        self.priorities = dict(self.PRIORITIES)
+        self.priorities.update(priorities or {})
+        self._queue = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stats = {}
+        self._threads = []
+        for num in range(workers):
+            thread = threading.Thread(target=self._work,
+                name="dynadotpy-scheduler-%d" % num)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def submit(self, method, priority=None, deadline=None, **kwargs):
+        """
+        Queue a client command.
+
+        :param method: Client method name, e.g. ``"register"``.
+        :param priority: Overrides the method's priority.
+        :param deadline: Seconds from now after which the command is not
+            sent any more.
+        :param kwargs: Arguments for the method.
+        :return: :class:`concurrent.futures.Future` of the method's result.
+        """
+        if method not in Dynadot.COMMANDS:
+            raise ValueError("Unknown command: %s" % method)
+        if priority is None:
+            priority = self.priorities[method]
+
+        future = Future()
+        queued = time.time()
+        expires = float("inf") if deadline is None else queued + deadline
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Cannot submit after shutdown.")
+            heapq.heappush(self._queue, (priority, expires,
+                next(self._counter), queued, method, kwargs, future))
+            stats = self._stats.get(priority)
+            if stats is None:
+                stats = self._stats[priority] = self._new_stats()
+            stats["submitted"] += 1
+            stats["queued"] += 1
+            self._cond.notify()
+        return future
+
+    def shutdown(self, wait=True, cancel_pending=False):
+        """
+        Stop accepting commands. Queued commands still run unless
+        ``cancel_pending`` is set.
+        """
+        with self._cond:
+            self._closed = True
+            if cancel_pending:
+                while self._queue:
+                    entry = heapq.heappop(self._queue)
+                    stats = self._stats[entry[0]]
+                    stats["queued"] -= 1
+                    stats["cancelled"] += 1
+                    entry[-1].cancel()
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def stats(self):
+        """
+        Return a `dict` of priority to:
+
+        * ``submitted`` - Commands queued.
+        * ``queued`` - Commands waiting right now.
+        * ``sent`` - Commands handed to the client.
+        * ``expired`` - Commands dropped because their deadline passed.
+        * ``cancelled`` - Commands cancelled before they were sent.
+        * ``wait_time`` - Total seconds sent commands spent queued.
+        * ``max_wait`` - Longest a sent command spent queued.
+        """
+        with self._cond:
+            return {priority: dict(stats)
+                for priority, stats in self._stats.items()}
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                priority, expires, _, queued, method, kwargs, future = (
+                    heapq.heappop(self._queue))
+
+                now = time.time()
+                stats = self._stats[priority]
+                stats["queued"] -= 1
+                if not future.set_running_or_notify_cancel():
+                    stats["cancelled"] += 1
+                    continue
+                if now > expires:
+                    stats["expired"] += 1
+                    future.set_exception(DeadlineExceeded(
+                        "%s was queued for %.3fs, past its deadline" % (
+                            method, now - queued)))
+                    continue
+                waited = now - queued
+                stats["sent"] += 1
+                stats["wait_time"] += waited
+                stats["max_wait"] = max(stats["max_wait"], waited)
+
+            try:
+                result = getattr(self.client, method)(**kwargs)
+            except Exception as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+    def _new_stats(self):
+        return {
+            "submitted": 0,
+            "queued": 0,
+            "sent": 0,
+            "expired": 0,
+            "cancelled": 0,
+            "wait_time": 0.0,
+            "max_wait": 0.0,
+        }
@@ -0,0 +1,196 @@
+"""
+Persistent local index of domain state, backed by SQLite.
+"""
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DomainStore(object):
+    """
+    Last known nameservers, expiration date, folder and renew option of
+    each domain in your account.
+
+    Pass it to :class:`dynadotpy.client.Dynadot` as ``store`` and successful
+    commands are recorded as they happen. Domains changed through the
+    client are flagged so the next :meth:`sync` reads them back from
+    Dynadot. Queries like :meth:`expiring_within` and
+    :meth:`domains_on_nameserver` use indexes and make no API calls.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS domains (
+            domain TEXT PRIMARY KEY,
+            expiration INTEGER,
+            folder TEXT,
+            renew_option TEXT,
+            synced_at REAL,
+            dirty INTEGER NOT NULL DEFAULT 1
+        );
+        CREATE INDEX IF NOT EXISTS domains_expiration
+            ON domains (expiration);
+        CREATE INDEX IF NOT EXISTS domains_sync ON domains (dirty, synced_at);
+        CREATE TABLE IF NOT EXISTS nameservers (
+            domain TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            nameserver TEXT NOT NULL,
+            PRIMARY KEY (domain, position)
+        );
+        CREATE INDEX IF NOT EXISTS nameservers_nameserver
+            ON nameservers (nameserver);
+    """
+
+    def __init__(self, path):
+        """
+        :param path: SQLite database file, created if missing. Use
+            ``":memory:"`` for a throwaway store.
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def add_domains(self, domains):
+        """Start tracking domains. They are read on the next :meth:`sync`."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO domains (domain) VALUES (?)",
+                ((domain.lower(),) for domain in domains))
+
+    def get(self, domain):
+        """Return a `dict` of everything known about a domain, or None."""
+        domain = domain.lower()
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM domains WHERE domain = ?",
+                (domain,)).fetchone()
+            if row is None:
+                return None
+            nameservers = [ns for (ns,) in self._conn.execute(
+                "SELECT nameserver FROM nameservers WHERE domain = ? "
+                "ORDER BY position", (domain,))]
+
+        state = dict(zip(row.keys(), row))
+        state["dirty"] = bool(state["dirty"])
+        state["nameservers"] = nameservers
+        return state
+
+    def record(self, command, domain, result, value=None):
+        """
+        Record a successful API command.
+
+        :param command: API command name, e.g. ``"get_ns"``.
+        :param domain: The domain the command was for.
+        :param result: The parsed result of the command.
+        :param value: The folder or renew option that was set.
+        """
+        domain = domain.lower()
+        with self._lock, self._conn:
+            if command == "delete":
+                self._forget(domain)
+                return
+
+            self._conn.execute(
+                "INSERT OR IGNORE INTO domains (domain) VALUES (?)", (domain,))
+            if command == "get_ns":
+                self._set_nameservers(domain, result.nameservers)
+            elif command in ("register", "renew"):
+                self._conn.execute("UPDATE domains SET expiration = ? "
+                    "WHERE domain = ?", (int(result["expiration_date"]), domain))
+            elif command == "set_folder":
+                self._conn.execute("UPDATE domains SET folder = ? "
+                    "WHERE domain = ?", (value, domain))
+            elif command == "set_renew_option":
+                self._conn.execute("UPDATE domains SET renew_option = ? "
+                    "WHERE domain = ?", (value, domain))
+
+            if command in ("register", "set_ns"):
+                self._conn.execute("UPDATE domains SET dirty = 1 "
+                    "WHERE domain = ?", (domain,))
+
+    def stale(self, max_age=86400, limit=None):
+        """
+        Return domains that were changed through the client, never read,
+        or last read more than ``max_age`` seconds ago.
+        """
+        sql = ("SELECT domain FROM domains WHERE dirty = 1 OR synced_at IS NULL "
+            "OR synced_at < ? ORDER BY dirty DESC, synced_at")
+        params = [time.time() - max_age]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [domain for (domain,) in self._conn.execute(sql, params)]
+
+    def sync(self, client, max_age=86400, max_workers=8, limit=None):
+        """
+        Re-read nameservers of stale domains from Dynadot.
+
+        :param client: :class:`dynadotpy.client.Dynadot` to read with.
+        :param max_age: Seconds after which a domain is re-read.
+        :param max_workers: Number of concurrent ``get_nameservers`` calls.
+        :param limit: Maximum number of domains to read in this run.
+        :return: `dict` of counts of ``synced`` and ``failed`` domains.
+        """
+        counts = {"synced": 0, "failed": 0}
+
+        def read(domain):
+            return domain, client.get_nameservers(domain=domain)
+
+        stale = self.stale(max_age, limit)
+        chunk = max_workers * 100
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for start in range(0, len(stale), chunk):
+                for domain, result in executor.map(read,
+                        stale[start:start + chunk]):
+                    if result.get("result") != "success":
+                        counts["failed"] += 1
+                        continue
+                    if getattr(client, "store", None) is not self:
+                        self.record("get_ns", domain, result)
+                    counts["synced"] += 1
+        return counts
+
+    def expiring_within(self, days):
+        """Return ``(domain, expiration_ms)`` pairs expiring in ``days``."""
+        now = int(time.time() * 1000)
+        with self._lock:
+            return [tuple(row) for row in self._conn.execute(
+                "SELECT domain, expiration FROM domains WHERE expiration "
+                "BETWEEN ? AND ? ORDER BY expiration",
+                (now, now + int(days * 86400 * 1000)))]
+
+    def expirations(self):
+        """Return ``(domain, expiration_ms)`` for every domain with one."""
+        with self._lock:
+            return [tuple(row) for row in self._conn.execute(
+                "SELECT domain, expiration FROM domains "
+                "WHERE expiration IS NOT NULL ORDER BY expiration")]
+
+    def domains_on_nameserver(self, nameserver):
+        """Return the domains that use ``nameserver``."""
+        with self._lock:
+            return [domain for (domain,) in self._conn.execute(
+                "SELECT DISTINCT domain FROM nameservers WHERE nameserver = ? "
+                "ORDER BY domain", (nameserver.lower(),))]
+
+    def _forget(self, domain):
+        self._conn.execute("DELETE FROM nameservers WHERE domain = ?",
+            (domain,))
+        self._conn.execute("DELETE FROM domains WHERE domain = ?", (domain,))
+
+    def _set_nameservers(self, domain, nameservers):
+        self._conn.execute("DELETE FROM nameservers WHERE domain = ?",
+            (domain,))
+        self._conn.executemany("INSERT INTO nameservers "
+            "(domain, position, nameserver) VALUES (?, ?, ?)",
+            [(domain, position, ns.lower())
+                for position, ns in enumerate(nameservers) if ns])
+        self._conn.execute("UPDATE domains SET synced_at = ?, dirty = 0 "
+            "WHERE domain = ?", (time.time(), domain))
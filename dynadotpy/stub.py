@@ -0,0 +1,265 @@
+"""
+A local stand-in for Dynadot's api2.html endpoint, for benchmarks and
+offline testing.
+
+::
+    >>> from dynadotpy.client import Dynadot
+    >>> from dynadotpy.stub import StubServer
+    >>> with StubServer(latency=0.05, busy_rate=0.01) as stub:
+    ...     dyn = Dynadot(api_key="stub")
+    ...     dyn.API_URL = stub.url
+    ...     dyn.register(domain="example.com", duration=1)
+
+It can also be run on its own: ``python -m dynadotpy.stub --port 8080``.
+
+Domains whose name contains ``taken`` are reported as unavailable, any
+other domain is available until it is registered. State is kept in memory.
+"""
+import argparse
+import random
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qsl, urlparse
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qsl, urlparse
+
+from dynadotpy.client import COMMAND_RESPONSES
+
+YEAR_MS = 365 * 24 * 60 * 60 * 1000
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        params = dict(parse_qsl(urlparse(self.path).query,
+            keep_blank_values=True))
+        body = self.server.stub.respond(params).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class StubServer(object):
+    """
+    Threaded HTTP server speaking the api2.html text protocol for
+    ``delete``, ``get_ns``, ``register``, ``renew``, ``search``,
+    ``set_folder``, ``set_ns`` and ``set_renew_option``.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, busy_rate=0.0, offline_rate=0.0,
+                 api_key=None, seed=None, echo_key=False):
+        """
+        :param host: Interface to listen on.
+        :param port: Port to listen on, 0 picks a free one.
+        :param latency: Seconds to wait before answering each request.
+        :param jitter: Extra random latency of up to this many seconds.
+        :param error_rate: Fraction of requests failing with a top-level
+            ``error`` status.
+        :param busy_rate: Fraction of results answered ``system_busy``, for
+            commands that have it in their response table.
+        :param offline_rate: Fraction of results answered ``offline``, for
+            commands that have it in their response table.
+        :param api_key: Only accept this key. Any key is accepted if None.
+        :param seed: Seed for the random failure injection.
+        :param echo_key: Put the API key each search was sent with in the
+            ``info`` field of its results, to check which account a
+            request used.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.busy_rate = busy_rate
+        self.offline_rate = offline_rate
+        self.api_key = api_key
+        self.echo_key = echo_key
+        self.domains = {}
+        self.requests = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), StubHandler)
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return "http://%s:%d/api2.html" % (host, port)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and close the listening socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self):
+        """Serve requests on the current thread."""
+        self._server.serve_forever()
+
+    def respond(self, params):
+        """Return the response body for a request's query params."""
+        delay = self.latency
+        if self.jitter:
+            delay += self._random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+        with self._lock:
+            self.requests += 1
+            if self.api_key is not None and params.get("key") != self.api_key:
+                return "error,invalid key\n"
+            if self._random.random() < self.error_rate:
+                return "error,injected error\n"
+
+            command = params.get("command")
+            handler = getattr(self, "_%s" % command, None)
+            if command not in COMMAND_RESPONSES or handler is None:
+                return "error,unknown command\n"
+
+            failure = self._failure(command)
+            if command == "search":
+                lines = self._search(params, failure)
+            else:
+                domain = params.get("domain", "").lower()
+                if not domain:
+                    return "error,missing domain\n"
+                lines = [self._failure_line(command, failure) if failure
+                    else handler(domain, params)]
+
+        return "ok,\n\n%s\n" % "\n".join(lines)
+
+    def _failure(self, command):
+        responses = COMMAND_RESPONSES[command]
+        if "system_busy" in responses and (
+                self._random.random() < self.busy_rate):
+            return "system_busy"
+        if "offline" in responses and (
+                self._random.random() < self.offline_rate):
+            return "offline"
+        return None
+
+    def _failure_line(self, command, failure):
+        if command in ("register", "renew"):
+            return "%s,," % failure
+        return "%s," % failure
+
+    def _delete(self, domain, params):
+        if self.domains.pop(domain, None) is None:
+            return "error,domain not in account"
+        return "success,"
+
+    def _get_ns(self, domain, params):
+        state = self.domains.get(domain)
+        if state is None:
+            return "error,domain not in account"
+        nameservers = list(state["nameservers"])
+        nameservers += [""] * (13 - len(nameservers))
+        return "success,%s," % ",".join(nameservers)
+
+    def _register(self, domain, params):
+        if domain in self.domains or "taken" in domain:
+            return "not_available,,"
+        expiration = int(time.time() * 1000) + (
+            int(params.get("duration", 1)) * YEAR_MS)
+        self.domains[domain] = {"nameservers": [], "folder": "",
+            "renew_option": "reset", "expiration": expiration}
+        return "success,,%d" % expiration
+
+    def _renew(self, domain, params):
+        state = self.domains.get(domain)
+        if state is None:
+            return "error,domain not in account,"
+        state["expiration"] += int(params.get("duration", 1)) * YEAR_MS
+        return "success,,%d" % state["expiration"]
+
+    def _search(self, params, failure):
+        info = params.get("key", "") if self.echo_key else ""
+        lines = []
+        num = 0
+        while "domain%d" % num in params:
+            domain = params["domain%d" % num]
+            if failure:
+                result = failure
+            elif domain.lower() in self.domains or "taken" in domain:
+                result = "no"
+            else:
+                result = "yes"
+            lines.append("domain%d,%s,,%s,%s" % (num, domain, result, info))
+            num += 1
+        return lines
+
+    def _set_folder(self, domain, params):
+        return self._update(domain, "folder", params.get("folder", ""))
+
+    def _set_ns(self, domain, params):
+        nameservers = [params["ns%d" % num] for num in range(13)
+            if params.get("ns%d" % num)]
+        return self._update(domain, "nameservers", nameservers)
+
+    def _set_renew_option(self, domain, params):
+        return self._update(domain, "renew_option", params.get("option"))
+
+    def _update(self, domain, field, value):
+        state = self.domains.get(domain)
+        if state is None:
+            return "error,domain not in account"
+        state[field] = value
+        return "success,"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a local stub of Dynadot's api2.html endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--busy-rate", type=float, default=0.0)
+    parser.add_argument("--offline-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    stub = StubServer(host=args.host, port=args.port, latency=args.latency,
+        jitter=args.jitter, error_rate=args.error_rate,
+        busy_rate=args.busy_rate, offline_rate=args.offline_rate)
+    print("Serving api2.html stub on %s" % stub.url)
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+HTTP transports that carry api2.html requests for
+:class:`dynadotpy.client.Dynadot`.
+
+A transport sends the query params of one command to the API URL and
+returns the response body as text. Connection errors and timeouts are
+raised as the matching ``requests`` exceptions whatever the backend, so
+:class:`dynadotpy.retry.RetryPolicy` treats them all the same.
+"""
+import codecs
+import json
+import threading
+import time
+
+
+class Transport(object):
+    """Base class for transports."""
+
+    def send(self, url, params, timeout=None):
+        """
+        Send one request.
+
+        :param url: The API URL.
+        :param params: `dict` of query params, including the API key.
+        :param timeout: Seconds to wait for the API, or None.
+        :return: The response body as text.
+        """
+        raise NotImplementedError
+
+    def stream(self, url, params, timeout=None):
+        """
+        Send one request and yield the response body as text chunks while
+        it downloads. Closing the generator releases the connection.
+        Transports that cannot stream yield the whole body at once.
+        """
+        yield self.send(url, params, timeout)
+
+    def send_timed(self, url, params, timeout=None):
+        """
+        Like :meth:`send`, also timing the wait for the response headers.
+
+        :return: Tuple of the body and the seconds until the headers
+            arrived, connecting included. Transports that cannot tell
+            count the whole request.
+        """
+        started = time.time()
+        body = self.send(url, params, timeout)
+        return body, time.time() - started
+
+    def close(self):
+        """Close pooled connections and open files."""
+
+
+class RequestsTransport(Transport):
+    """
+    Pooled keep-alive connections with a ``requests.Session``. The session,
+    and ``requests`` itself, are only loaded by the first request.
+    """
+
+    def __init__(self, pool_connections=1, pool_maxsize=10, pool_block=False,
+                 keep_alive=True):
+        """
+        :param pool_connections: Number of per-host connection pools to keep.
+        :param pool_maxsize: Maximum connections kept open per host.
+        :param pool_block: Block when the pool is exhausted instead of
+            opening throwaway connections.
+        :param keep_alive: Reuse connections between requests.
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._new_session()
+        return self._session
+
+    def send(self, url, params, timeout=None):
+        return self.session.get(url, params=params, timeout=timeout).text
+
+    def send_timed(self, url, params, timeout=None):
+        started = time.time()
+        req = self.session.get(url, params=params, timeout=timeout,
+            stream=True)
+        headers = time.time() - started
+        return req.text, headers
+
+    def stream(self, url, params, timeout=None):
+        req = self.session.get(url, params=params, timeout=timeout,
+            stream=True)
+        try:
+            req.encoding = req.encoding or "utf-8"
+            for chunk in req.iter_content(chunk_size=8192,
+                    decode_unicode=True):
+                yield chunk
+        finally:
+            req.close()
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+    def _new_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize, pool_block=self.pool_block)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+
+class Urllib3Transport(Transport):
+    """
+    Pooled connections straight on ``urllib3``, skipping the session,
+    hook and adapter layers of ``requests``. Noticeably less CPU per
+    request when many threads share one client. The pool is created by
+    the first request.
+    """
+
+    def __init__(self, pool_connections=1, pool_maxsize=10, pool_block=False,
+                 keep_alive=True):
+        """
+        :param pool_connections: Number of per-host connection pools to keep.
+        :param pool_maxsize: Maximum connections kept open per host.
+        :param pool_block: Block when the pool is exhausted instead of
+            opening throwaway connections.
+        :param keep_alive: Reuse connections between requests.
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.headers = {} if keep_alive else {"Connection": "close"}
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    import urllib3
+                    self._pool = urllib3.PoolManager(
+                        num_pools=self.pool_connections,
+                        maxsize=self.pool_maxsize, block=self.pool_block)
+        return self._pool
+
+    def send(self, url, params, timeout=None):
+        try:
+            response = self.pool.request("GET", url, fields=params,
+                headers=self.headers, timeout=timeout, retries=False)
+        except Exception as exc:
+            raise _requests_error(exc)
+        return response.data.decode("utf-8")
+
+    def send_timed(self, url, params, timeout=None):
+        started = time.time()
+        try:
+            response = self.pool.request("GET", url, fields=params,
+                headers=self.headers, timeout=timeout, retries=False,
+                preload_content=False)
+        except Exception as exc:
+            raise _requests_error(exc)
+
+        headers = time.time() - started
+        try:
+            body = response.read()
+        except Exception as exc:
+            raise _requests_error(exc)
+        finally:
+            response.release_conn()
+        return body.decode("utf-8"), headers
+
+    def stream(self, url, params, timeout=None):
+        try:
+            response = self.pool.request("GET", url, fields=params,
+                headers=self.headers, timeout=timeout, retries=False,
+                preload_content=False)
+        except Exception as exc:
+            raise _requests_error(exc)
+
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        try:
+            for chunk in response.stream(8192):
+                yield decoder.decode(chunk)
+            yield decoder.decode(b"", final=True)
+        finally:
+            response.release_conn()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.clear()
+
+
+def _requests_error(exc):
+    """Return the ``requests`` exception matching a ``urllib3`` one."""
+    import requests
+    from urllib3 import exceptions
+
+    if isinstance(exc, exceptions.NewConnectionError):
+        return requests.ConnectionError(exc)
+    if isinstance(exc, exceptions.ConnectTimeoutError):
+        return requests.ConnectTimeout(exc)
+    if isinstance(exc, exceptions.ReadTimeoutError):
+        return requests.ReadTimeout(exc)
+    if isinstance(exc, exceptions.HTTPError):
+        return requests.ConnectionError(exc)
+    return exc
+
+
+def _record_key(params):
+    """Identify a request by its params, leaving out the API key."""
+    return json.dumps(sorted((str(name), str(value))
+        for name, value in params.items() if name != "key"))
+
+
+class RecordingTransport(Transport):
+    """
+    Passes requests to another transport and appends each response to a
+    file, one JSON object per line, for :class:`ReplayTransport`. The API
+    key is not recorded.
+    """
+
+    def __init__(self, inner, path):
+        """
+        :param inner: The :class:`Transport` that sends the requests.
+        :param path: File responses are appended to.
+        """
+        self.inner = inner
+        self.path = path
+        self._fp = open(path, "a")
+        self._lock = threading.Lock()
+
+    def send(self, url, params, timeout=None):
+        body = self.inner.send(url, params, timeout)
+        self._record(params, body)
+        return body
+
+    def send_timed(self, url, params, timeout=None):
+        body, headers = self.inner.send_timed(url, params, timeout)
+        self._record(params, body)
+        return body, headers
+
+    def stream(self, url, params, timeout=None):
+        chunks = []
+        for chunk in self.inner.stream(url, params, timeout):
+            chunks.append(chunk)
+            yield chunk
+        self._record(params, "".join(chunks))
+
+    def close(self):
+        with self._lock:
+            self._fp.close()
+        self.inner.close()
+
+    def _record(self, params, body):
+        line = json.dumps({"params": {name: str(value)
+            for name, value in params.items() if name != "key"},
+            "body": body}, sort_keys=True)
+        with self._lock:
+            self._fp.write(line + "\n")
+            self._fp.flush()
+
+
+class ReplayTransport(Transport):
+    """
+    Answers requests from a file written by :class:`RecordingTransport`,
+    without any network I/O. Requests are matched on their params, API
+    key excluded. A request recorded several times gets its responses in
+    recorded order, starting over after the last one.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: File written by :class:`RecordingTransport`.
+        """
+        self.path = path
+        self.replayed = 0
+        self._responses = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+        with open(path) as fp:
+            for line in fp:
+                if line.strip():
+                    record = json.loads(line)
+                    self._responses.setdefault(_record_key(record["params"]),
+                        []).append(record["body"])
+
+    def send(self, url, params, timeout=None):
+        key = _record_key(params)
+        with self._lock:
+            bodies = self._responses.get(key)
+            if bodies is None:
+                raise KeyError("No recorded response for %s" % key)
+            position = self._positions.get(key, 0)
+            self._positions[key] = (position + 1) % len(bodies)
+            self.replayed += 1
+        return bodies[position]
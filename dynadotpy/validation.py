@@ -0,0 +1,99 @@
+"""
+Local validation and normalization of domain and nameserver names, so
+malformed input is rejected before it costs an API round-trip.
+"""
+import re
+
+# Common TLDs, for callers who want to restrict input to them. It is not a
+# complete list, so nothing uses it unless asked to.
+TLDS = frozenset("""
+    ac ae ag ai am app art asia at au be bid bio biz blog br bz ca cafe cc
+    ch chat city cl click club cn co com company cool cx cz de design dev
+    digital dk email es eu events fi fm fr fun fyi gg gl gold group guru hk
+    host icu id ie in info io ist it jp kr la land li life link live lol ltd
+    lu me media mn mobi mx my name net network news nl no nu nz online org
+    page ph pl plus pro pt pw re red rocks ru run sale sb sc se sg sh shop
+    site so social solutions space store stream studio su tech tel tk to
+    today top tv tw uk us vc vip wiki win world ws xyz yt zone
+""".split())
+
+_HOSTNAME = re.compile(
+    r"^(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z0-9-]{2,63}$")
+
+
+def _to_ascii(name):
+    name = name.strip().lower().rstrip(".")
+    try:
+        name.encode("ascii")
+    except UnicodeError:
+        return name.encode("idna").decode("ascii")
+    return name
+
+
+def normalize_names(names, tlds=None):
+    """
+    Normalize and validate a list of domain or host names in one pass.
+
+    Names are stripped, lowercased and IDNA-encoded, then checked against
+    label and length rules and, if ``tlds`` is given, against that set of
+    TLDs.
+
+    :param names: `list` of names.
+    :param tlds: Set of allowed TLDs. Empty or None allows any TLD.
+    :return: Tuple of a `list` with the normalized name, or None if it is
+        invalid, for each input name, and a `dict` of the index of each
+        invalid name to the reason.
+    """
+    normalized = []
+    errors = {}
+    match = _HOSTNAME.match
+    to_ascii = _to_ascii
+
+    for num, name in enumerate(names):
+        try:
+            name = to_ascii(name)
+        except (UnicodeError, AttributeError):
+            errors[num] = "Invalid IDN"
+            normalized.append(None)
+            continue
+
+        if len(name) > 253 or match(name) is None:
+            errors[num] = "Invalid domain name"
+        elif tlds and name[name.rindex(".") + 1:] not in tlds:
+            errors[num] = "Unsupported TLD"
+        else:
+            normalized.append(name)
+            continue
+        normalized.append(None)
+
+    return normalized, errors
+
+
+def normalize_domain(name, tlds=None):
+    """
+    Normalize a single domain name.
+
+    :raises ValueError: If the name is invalid.
+    """
+    normalized, errors = normalize_names([name], tlds)
+    if errors:
+        raise ValueError("%s: %s" % (errors[0], name))
+    return normalized[0]
+
+
+def normalize_nameservers(nameservers):
+    """
+    Normalize nameserver host names and drop duplicates, keeping order.
+
+    :raises ValueError: If a name is invalid.
+    """
+    normalized, errors = normalize_names(nameservers, tlds=None)
+    if errors:
+        num = min(errors)
+        raise ValueError("%s: %s" % (errors[num], nameservers[num]))
+
+    unique = []
+    for name in normalized:
+        if name not in unique:
+            unique.append(name)
+    return unique
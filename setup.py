@@ -12,10 +12,21 @@ setup(
     license="BSD",
     packages=["dynadotpy"],
     zip_safe=False,
+    python_requires=">=3.6",
     install_requires=["requests"],
+    extras_require={"async": ["aiohttp"]},
+    entry_points={"console_scripts": ["dynadotpy = dynadotpy.cli:main"]},
     include_package_data=True,
     classifiers=[
-        "Programming Language :: Python :: 2 :: Only",
+        "Programming Language :: Python :: 3",
+        "Programming Language :: Python :: 3 :: Only",
+        "Programming Language :: Python :: 3.6",
+        "Programming Language :: Python :: 3.7",
+        "Programming Language :: Python :: 3.8",
+        "Programming Language :: Python :: 3.9",
+        "Programming Language :: Python :: 3.10",
+        "Programming Language :: Python :: 3.11",
+        "Programming Language :: Python :: 3.12",
         "License :: OSI Approved :: BSD License",
         "Topic :: Software Development :: Libraries :: Python Modules",
         "Environment :: Web Environment",